@@ -0,0 +1,108 @@
+"""
+Requests/sec of the api routers behind the previous BaseHTTPMiddleware
+auth/DB-session pair against the current pure-ASGI middleware.
+
+    python benchmarks/asgi_middleware.py /api/roles/ --header "Authorization: Bearer <token>"
+    python benchmarks/asgi_middleware.py /bench/ping --no-warm-caches
+
+Both apps are driven in-process through httpx.ASGITransport, so the numbers
+exclude the HTTP server and show the middleware cost directly. /bench/ping
+is a handler that touches nothing: with it and without a token the run
+needs no database. Other paths hit the database from .env.
+"""
+import argparse
+import asyncio
+
+from common import print_load, run_load  # puts src/ on sys.path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.routes import router as api_router
+from core.db import db_instance
+from middleware.auth_middleware import AuthMiddleware
+from middleware.db_middleware import DBSessionMiddleware
+from services.auth import auth_service
+from services.reference_data import reference_cache
+from services.revocation import revocation_list
+
+
+class BaseHTTPDBSessionMiddleware(BaseHTTPMiddleware):
+    """DBSessionMiddleware as it was before the pure-ASGI rewrite"""
+
+    def __init__(self, app, session_factory):
+        super().__init__(app)
+        self.session_factory = session_factory
+
+    async def dispatch(self, request: Request, call_next):
+        async with self.session_factory() as session:
+            request.state.db = session
+            return await call_next(request)
+
+
+class BaseHTTPAuthMiddleware(BaseHTTPMiddleware):
+    """AuthMiddleware as it was before, on top of the current token verifier"""
+
+    async def dispatch(self, request: Request, call_next):
+        token = request.headers.get("Authorization")
+        user = None
+        if token:
+            if token.startswith("Bearer "):
+                token = token[7:]
+            user = await auth_service.get_user_from_token(token, request.state.db)
+        request.state.user = user
+        return await call_next(request)
+
+
+def build_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(api_router)
+
+    @app.get("/bench/ping")
+    async def ping():
+        return {"ok": True}
+
+    if pure_asgi:
+        app.add_middleware(AuthMiddleware)
+        app.add_middleware(DBSessionMiddleware, session_factory=db_instance._async_session_maker,
+                           replica_router=db_instance.replica_router)
+    else:
+        app.add_middleware(BaseHTTPAuthMiddleware)
+        app.add_middleware(BaseHTTPDBSessionMiddleware, session_factory=db_instance._async_session_maker)
+    return app
+
+
+async def bench(args) -> None:
+    if args.warm_caches:
+        # What the lifespan does before serving, so both apps start warm
+        await reference_cache.load()
+        await revocation_list.load()
+    rows = []
+    for name, pure_asgi in (("BaseHTTPMiddleware", False), ("pure ASGI", True)):
+        transport = httpx.ASGITransport(app=build_app(pure_asgi))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers=args.headers) as client:
+            rows.append((name, await run_load(client, args.path, args.concurrency,
+                                              args.duration, args.warmup)))
+    await db_instance._engine.dispose()
+    print_load(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="/api/roles/")
+    parser.add_argument("--header", action="append", default=[], help='"Name: value", repeatable')
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--no-warm-caches", dest="warm_caches", action="store_false",
+                        help="do not preload reference data and revoked tokens from the database")
+    args = parser.parse_args()
+    args.headers = dict(header.split(": ", 1) for header in args.header)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Import throughput of the users table: one create_data/update_data/
+delete_data call (and commit) per row, as a loop of single-item requests
+does, against bulk_create/bulk_update/bulk_delete over the whole batch.
+
+    python benchmarks/bulk.py --rows 10000 --per-row 1000
+
+The per-row path is slow by design, so it runs on --per-row rows and both
+paths are compared in rows/s. Everything is written to the database from
+.env with bench-*@example.invalid emails and deleted at the end.
+"""
+import argparse
+import asyncio
+import time
+
+from common import bench_user_rows, delete_bench_users, print_rates  # puts src/ on sys.path
+
+from core.db import db_instance
+from repositories.users import UserRepository
+
+
+async def per_row(rows: list[dict]) -> dict[str, float]:
+    rates = {}
+    async with db_instance._async_session_maker() as session:
+        repo = UserRepository(session)
+        started = time.perf_counter()
+        ids = [(await repo.create_data(row)).id for row in rows]
+        rates["create"] = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for id in ids:
+            await repo.update_data(id, {"first_name": "Updated"})
+        rates["update"] = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for id in ids:
+            await repo.delete_data(id)
+        rates["delete"] = len(rows) / (time.perf_counter() - started)
+    return rates
+
+
+async def bulk(rows: list[dict]) -> dict[str, float]:
+    rates = {}
+    async with db_instance._async_session_maker() as session:
+        repo = UserRepository(session)
+        started = time.perf_counter()
+        ids = [user.id for user in await repo.bulk_create(rows)]
+        rates["create"] = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        await repo.bulk_update([{"id": id, "first_name": "Updated"} for id in ids])
+        rates["update"] = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        await repo.bulk_delete(ids)
+        rates["delete"] = len(rows) / (time.perf_counter() - started)
+    return rates
+
+
+async def bench(args) -> None:
+    try:
+        single = await per_row(bench_user_rows(args.per_row))
+        batch = await bulk(bench_user_rows(args.rows))
+    finally:
+        async with db_instance._async_session_maker() as session:
+            await delete_bench_users(session)
+        await db_instance._engine.dispose()
+    for operation in ("create", "update", "delete"):
+        print(f"{operation} (rows/s)")
+        print_rates([
+            (f"per-row x{args.per_row}", single[operation]),
+            (f"bulk x{args.rows}", batch[operation]),
+        ], baseline=f"per-row x{args.per_row}")
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="batch size for the bulk path")
+    parser.add_argument("--per-row", type=int, default=1000, help="rows for the per-row path")
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
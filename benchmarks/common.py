@@ -0,0 +1,177 @@
+"""
+Shared helpers for the benchmark scripts. Scripts import the app from src/,
+so they need the same environment (.env) as the app itself.
+"""
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import httpx
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+# The app configures INFO logging; a line per benchmark request drowns the results
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def measure(fn, duration: float, batch: int = 100) -> float:
+    """Calls of fn per second over duration seconds"""
+    for _ in range(batch):
+        fn()
+    calls = 0
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < duration:
+        for _ in range(batch):
+            fn()
+        calls += batch
+    return calls / elapsed
+
+
+async def measure_async(fn, duration: float, batch: int = 10) -> float:
+    """Same for coroutines: fn() returns an awaitable"""
+    for _ in range(batch):
+        await fn()
+    calls = 0
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < duration:
+        for _ in range(batch):
+            await fn()
+        calls += batch
+    return calls / elapsed
+
+
+def print_rates(rows: list[tuple[str, float]], baseline: str | None = None) -> None:
+    """ops/s table; with baseline a speedup column is added"""
+    base = dict(rows).get(baseline)
+    width = max(len(name) for name, _ in rows)
+    print(f"{'case':<{width}} {'ops/s':>12} {'us/op':>9}" + (f" {'speedup':>8}" if base else ""))
+    for name, rate in rows:
+        line = f"{name:<{width}} {rate:>12.1f} {1e6 / rate:>9.2f}"
+        if base:
+            line += f" {rate / base:>7.2f}x"
+        print(line)
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int,
+                   duration: float, warmup: float) -> dict:
+    """
+    Closed-loop load: concurrency clients each repeat GET path for duration
+    seconds after warmup. Responses with status >= 500 count as errors
+    """
+    latencies, errors = [], 0
+
+    async def worker(until: float, record: bool) -> None:
+        nonlocal errors
+        while time.monotonic() < until:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            if not record:
+                continue
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    until = time.monotonic() + warmup
+    await asyncio.gather(*(worker(until, False) for _ in range(concurrency)))
+    started = time.monotonic()
+    await asyncio.gather(*(worker(started + duration, True) for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": quantiles[49] * 1000,
+        "p99": quantiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+def print_load(rows: list[tuple[str, dict]]) -> None:
+    width = max(10, *(len(name) for name, _ in rows))
+    print(f"{'case':<{width}} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in rows:
+        print(f"{name:<{width}} {result['rps']:>10.1f} {result['p50']:>8.1f} "
+              f"{result['p99']:>8.1f} {result['errors']:>7}")
+
+
+async def timed_runs(fn, repeat: int) -> dict:
+    """
+    Latency of awaiting fn() repeat times, then one more run under
+    tracemalloc for the peak of Python allocations
+    """
+    await fn()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        await fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "mean": statistics.fmean(latencies) * 1000,
+        "p50": statistics.median(latencies) * 1000,
+        "max": max(latencies) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def print_timings(rows: list[tuple[str, dict]]) -> None:
+    width = max(len(name) for name, _ in rows)
+    print(f"{'case':<{width}} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9} {'peak KiB':>10}")
+    for name, result in rows:
+        print(f"{name:<{width}} {result['mean']:>9.1f} {result['p50']:>9.1f} "
+              f"{result['max']:>9.1f} {result['peak_kib']:>10.0f}")
+
+
+def bench_user_rows(count: int) -> list[dict]:
+    """Rows for the users table that delete_bench_users can find again"""
+    run = uuid.uuid4().hex[:8]
+    return [
+        {"email": f"bench-{run}-{n}@example.invalid", "first_name": f"Bench{n}",
+         "last_name": "User", "image": "", "password": ""}
+        for n in range(count)
+    ]
+
+
+async def seed_users(session, count: int) -> list[int]:
+    """Inserts count users, each with one of the existing roles; returns their ids"""
+    from sqlalchemy import insert, select
+
+    from models import Role, User, association_table
+
+    ids = list(await session.scalars(insert(User).returning(User.id), bench_user_rows(count)))
+    role_ids = list(await session.scalars(select(Role.id)))
+    if role_ids:
+        await session.execute(insert(association_table), [
+            {"users_id": id, "roles_id": role_ids[n % len(role_ids)]} for n, id in enumerate(ids)
+        ])
+    await session.commit()
+    return ids
+
+
+async def delete_bench_users(session) -> None:
+    """Removes every user created by the benchmarks, with their role links"""
+    from sqlalchemy import delete, select
+
+    from models import User, association_table
+
+    bench_ids = select(User.id).where(User.email.like("bench-%@example.invalid"))
+    await session.execute(delete(association_table).where(association_table.c.users_id.in_(bench_ids)))
+    await session.execute(delete(User).where(User.email.like("bench-%@example.invalid")))
+    await session.commit()
@@ -0,0 +1,84 @@
+"""
+Throughput comparison of the development launcher (main.py) and the
+production one (server.py) on the same endpoint and database.
+
+    python benchmarks/launchers.py /api/projects/<id> \
+        --header "Authorization: Bearer <token>" --concurrency 128 --duration 60
+
+Each launcher is started from src/ with the current environment (.env),
+warmed up, loaded by a closed-loop httpx client for --duration seconds and
+stopped with SIGTERM. The client runs in this process, so on small machines
+run it from another host with --no-start against already started servers.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import SRC, print_load, run_load
+
+LAUNCHERS = {
+    "main.py": [sys.executable, "main.py"],
+    "server.py": [sys.executable, "server.py"],
+}
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float, process=None) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process and process.poll() is not None:
+            raise RuntimeError(f"launcher exited with code {process.returncode}")
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} is not reachable after {timeout}s")
+
+
+async def load(url: str, headers: dict, concurrency: int, duration: float, warmup: float,
+               process=None) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        await wait_ready(client, url, timeout=60, process=process)
+        return await run_load(client, url, concurrency, duration, warmup)
+
+
+def run_launcher(name: str, args) -> dict:
+    process = None
+    if args.start:
+        process = subprocess.Popen(LAUNCHERS[name], cwd=SRC, env=os.environ.copy(), start_new_session=True)
+    try:
+        return asyncio.run(load(args.base_url + args.path, args.headers, args.concurrency,
+                                args.duration, args.warmup, process))
+    finally:
+        if process and process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="endpoint to load, e.g. /api/projects/1")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--header", action="append", default=[], help='"Name: value", repeatable')
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--launcher", choices=LAUNCHERS, action="append",
+                        help="launchers to compare, all by default")
+    parser.add_argument("--no-start", dest="start", action="store_false",
+                        help="do not spawn launchers, load an already running server")
+    args = parser.parse_args()
+    args.headers = dict(header.split(": ", 1) for header in args.header)
+
+    print_load([(name, run_launcher(name, args)) for name in args.launcher or LAUNCHERS])
+
+
+if __name__ == "__main__":
+    main()
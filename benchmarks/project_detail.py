@@ -0,0 +1,90 @@
+"""
+GET /api/projects/{id} loaders: the previous selectinload chain plus
+response_model validation and JSON rendering, against the single
+json_build_object statement of ProjectRepository.get_project_json.
+
+    python benchmarks/project_detail.py 42 --repeat 50
+
+Runs against an existing project in the database from .env; pick one with
+realistic numbers of participants and tasks. Both paths produce the
+response body bytes, each in a fresh session; the statement count per run
+is taken from the engine's before_cursor_execute events.
+"""
+import argparse
+import asyncio
+
+from common import print_timings, timed_runs  # puts src/ on sys.path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from core.db import db_instance
+from models import Project, Task, User
+from repositories.projects import ProjectRepository
+from schemas.projects import ProjectResponseSchema
+
+
+async def selectinload_body(project_id: int) -> bytes:
+    async with db_instance._async_session_maker() as session:
+        project = await ProjectRepository(session).get_data_by_id(
+            project_id,
+            selectinload(Project.owner).selectinload(User.roles),
+            selectinload(Project.participating_users).selectinload(User.roles),
+            selectinload(Project.tasks).options(
+                selectinload(Task.performer),
+                selectinload(Task.status),
+                selectinload(Task.priority)
+            )
+        )
+        return ORJSONResponse(jsonable_encoder(ProjectResponseSchema.model_validate(project))).body
+
+
+async def json_body(project_id: int) -> bytes:
+    async with db_instance._async_session_maker() as session:
+        return await ProjectRepository(session).get_project_json(project_id)
+
+
+async def statements(fn) -> int:
+    count = 0
+
+    def counter(*_):
+        nonlocal count
+        count += 1
+
+    event.listen(db_instance._engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        await fn()
+    finally:
+        event.remove(db_instance._engine.sync_engine, "before_cursor_execute", counter)
+    return count
+
+
+async def bench(args) -> None:
+    cases = {
+        "selectinload + schema": lambda: selectinload_body(args.project_id),
+        "json_build_object": lambda: json_body(args.project_id),
+    }
+    try:
+        body = await json_body(args.project_id)
+        if body is None:
+            raise SystemExit(f"project {args.project_id} does not exist")
+        print(f"project {args.project_id}: {len(body)} bytes")
+        for name, fn in cases.items():
+            print(f"{name}: {await statements(fn)} statements")
+        print_timings([(name, await timed_runs(fn, args.repeat)) for name, fn in cases.items()])
+    finally:
+        await db_instance._engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
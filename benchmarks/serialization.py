@@ -0,0 +1,89 @@
+"""
+Response serialization over ProjectResponseSchema payloads: the stdlib-json
+JSONResponse FastAPI used before against the app-wide ORJSONResponse.
+
+    python benchmarks/serialization.py --participants 20 --tasks 200
+
+Every case validates the same dict through ProjectResponseSchema first, as
+response_model does, then renders the body the way the response class would.
+Pure CPU work, no database needed.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from common import measure, print_rates  # puts src/ on sys.path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from schemas.projects import ProjectResponseSchema
+
+
+def make_project(participants: int, tasks: int) -> dict:
+    now = datetime.now()
+    roles = [
+        {"id": id, "name": name, "slug": name, "created_at": now, "updated_at": now}
+        for id, name in enumerate(["admin", "manager", "member"], start=1)
+    ]
+    users = [
+        {
+            "id": id,
+            "email": f"user{id}@example.com",
+            "image": f"/media/avatars/{id:02x}/{id:064x}.png",
+            "first_name": f"First{id}",
+            "last_name": f"Last{id}",
+            "roles": roles[id % 3:],
+        }
+        for id in range(1, participants + 1)
+    ]
+    status = {"id": 1, "title": "In progress", "slug": "in-progress", "created_at": now, "updated_at": now}
+    priority = {"id": 2, "title": "High", "slug": "high", "created_at": now, "updated_at": now}
+    return {
+        "id": 1,
+        "title": "Benchmark project",
+        "owner": users[0],
+        "participating_users": users,
+        "tasks": [
+            {
+                "id": id,
+                "title": f"Task {id}",
+                "text": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+                "deadline": now + timedelta(days=id),
+                "performer": users[id % participants],
+                "status": status,
+                "priority": priority,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for id in range(1, tasks + 1)
+        ],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=2, help="seconds per case")
+    args = parser.parse_args()
+
+    data = make_project(args.participants, args.tasks)
+    validate = ProjectResponseSchema.model_validate
+    body = ORJSONResponse(validate(data).model_dump()).body
+    print(f"payload: {args.participants} participants, {args.tasks} tasks, {len(body)} bytes")
+    print_rates([
+        ("JSONResponse(jsonable_encoder)",
+         measure(lambda: JSONResponse(jsonable_encoder(validate(data))).body, args.duration, batch=1)),
+        ("ORJSONResponse(jsonable_encoder)",
+         measure(lambda: ORJSONResponse(jsonable_encoder(validate(data))).body, args.duration, batch=1)),
+        ("ORJSONResponse(model_dump)",
+         measure(lambda: ORJSONResponse(validate(data).model_dump()).body, args.duration, batch=1)),
+        ("model_dump_json",
+         measure(lambda: validate(data).model_dump_json(), args.duration, batch=1)),
+    ], baseline="JSONResponse(jsonable_encoder)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Tokens verified/signed per second: python-jose (the path AuthService used
+before) against TokenCodec and the cached TokenVerifier.
+
+    python benchmarks/tokens.py --duration 3
+
+Pure CPU work, no database needed; settings are still read from the
+environment because services.tokens builds its module-level codec.
+"""
+import argparse
+import time
+
+from common import measure, print_rates  # puts src/ on sys.path
+
+from jose import jwt
+
+from core.config import settings
+from services.tokens import TokenCodec, TokenVerifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=2, help="seconds per case")
+    parser.add_argument("--algorithm", default=settings.JWT_ALGORITHM)
+    args = parser.parse_args()
+
+    secret = settings.JWT_SECRET_KEY
+    codec = TokenCodec(secret, args.algorithm)
+    verifier = TokenVerifier(codec, maxsize=1024, ttl=300)
+    payload = {"user_id": 1, "type": "access", "jti": "0" * 32, "exp": int(time.time()) + 3600}
+    token = codec.encode(payload)
+    verifier.verify(token)
+
+    print(f"verify ({args.algorithm})")
+    print_rates([
+        ("jose.jwt.decode", measure(lambda: jwt.decode(token, secret, algorithms=[args.algorithm]), args.duration)),
+        ("TokenCodec.decode", measure(lambda: codec.decode(token), args.duration)),
+        ("TokenVerifier.verify (hit)", measure(lambda: verifier.verify(token), args.duration)),
+    ], baseline="jose.jwt.decode")
+    print()
+    print(f"sign ({args.algorithm})")
+    print_rates([
+        ("jose.jwt.encode", measure(lambda: jwt.encode(payload, secret, algorithm=args.algorithm), args.duration)),
+        ("TokenCodec.encode", measure(lambda: codec.encode(payload), args.duration)),
+    ], baseline="jose.jwt.encode")
+
+
+if __name__ == "__main__":
+    main()
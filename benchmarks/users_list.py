@@ -0,0 +1,70 @@
+"""
+GET /api/users/ data path at 10k+ rows: fully hydrated ORM objects
+validated with from_attributes (the previous path) against the column
+projection that UserRepository.paginate uses for UserResponseSchema.
+
+    python benchmarks/users_list.py --rows 10000 --repeat 10
+
+Seeds --rows users (with role links) into the database from .env, reads a
+page of that size through both paths in a fresh session per run, prints
+latency and the tracemalloc peak, and deletes the seeded users afterwards.
+"""
+import argparse
+import asyncio
+
+from common import delete_bench_users, print_timings, seed_users, timed_runs  # puts src/ on sys.path
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from core.db import db_instance
+from models import User
+from repositories.users import UserRepository
+from schemas.users import UserResponseSchema
+from services.reference_data import reference_cache
+
+
+async def orm_page(limit: int) -> list:
+    async with db_instance._async_session_maker() as session:
+        result = await session.execute(
+            select(User).options(selectinload(User.roles)).order_by(User.id).limit(limit)
+        )
+        return [UserResponseSchema.model_validate(user) for user in result.scalars().all()]
+
+
+async def projected_page(limit: int) -> list:
+    async with db_instance._async_session_maker() as session:
+        items, _ = await UserRepository(session).paginate(limit=limit, schema=UserResponseSchema)
+        return [UserResponseSchema.model_validate(item) for item in items]
+
+
+async def bench(args) -> None:
+    async with db_instance._async_session_maker() as session:
+        if args.seed:
+            await seed_users(session, args.rows)
+    # Roles come from memory on the projection path, as after the lifespan
+    await reference_cache.load()
+    try:
+        print_timings([
+            ("ORM + from_attributes", await timed_runs(lambda: orm_page(args.rows), args.repeat)),
+            ("column projection", await timed_runs(lambda: projected_page(args.rows), args.repeat)),
+        ])
+    finally:
+        if args.seed:
+            async with db_instance._async_session_maker() as session:
+                await delete_bench_users(session)
+        await db_instance._engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="users to seed and read per page")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--no-seed", dest="seed", action="store_false",
+                        help="read the existing users instead of seeding")
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
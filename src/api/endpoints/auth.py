@@ -4,15 +4,16 @@ import httpx
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, Response, Body
 from fastapi.responses import JSONResponse, RedirectResponse
-from fastapi.encoders import jsonable_encoder
 from jose import JWTError
 from google.oauth2 import id_token
 from google.auth.transport import requests
 from datetime import datetime
 
 from core.config import settings
+from core.http_cache import cache_headers, make_etag, not_modified_response
 from repositories.users import UserRepository
 from repositories.otp import OTPRepository
+from repositories.outbox import EmailOutboxRepository
 from schemas.auth import (
     AuthLoginSchema, AuthLoginResponseSchema,
     AuthProfileSchema, AuthProfileUpdateSchema,
@@ -21,7 +22,8 @@ from schemas.auth import (
     AuthTokenRefreshSchema, AuthTokenRefreshResponseSchema,
     OTPSchema, OTPCheckSchema
 )
-from services.auth import AuthService, OTPService
+from services.auth import AuthService, OTPService, auth_service
+from services.revocation import revocation_list
 from services.users import UserService
 from services.base_service import BaseService
 
@@ -68,23 +70,19 @@ async def send_otp(request: Request, data: OTPSchema):
                 </body>
             </html>
         """
-        send_message = await BaseService.send_message_to_email(
-            emails_to=[data.email], message=message
-        )
-        if send_message:
-            otp_data = {
-                'email': data.email,
-                'code': code
+        EmailOutboxRepository(db).enqueue(emails_to=[data.email], message=message)
+        otp_data = {
+            'email': data.email,
+            'code': code
+        }
+        otp_repo = OTPRepository(db)
+        otp = await otp_repo.create_data(otp_data)
+        if otp:
+            return {
+                "status": "success",
+                "message": f"OTP success send to email: {otp.email}"
             }
-            otp_repo = OTPRepository(db)
-            otp = await otp_repo.create_data(otp_data)
-            if otp:
-                return {
-                    "status": "success",
-                    "message": f"OTP success send to email: {otp.email}"
-                }
-            raise HTTPException(status_code=500, detail="Create otp failed")
-        raise HTTPException(status_code=500, detail="Send message failed")
+        raise HTTPException(status_code=500, detail="Create otp failed")
     raise HTTPException(status_code=500, detail="Request failed")
 
 
@@ -120,7 +118,7 @@ async def checking_otp(request: Request, data: OTPCheckSchema):
         raise HTTPException(status_code=500, detail="Ошибка при создании пользователя")
 
 
-@router.post("/login", response_model=AuthLoginResponseSchema)
+@router.post("/login", response_model=AuthLoginResponseSchema, status_code=201)
 async def login(request: Request, auth_data: AuthLoginSchema):
     db = request.state.db
     user_repo = UserRepository(db)
@@ -131,8 +129,8 @@ async def login(request: Request, auth_data: AuthLoginSchema):
     access_payload = {"user_id": user.id, "type": "access"}
     refresh_payload = {"user_id": user.id, "type": "refresh"}
 
-    access_token = AuthService().create_token(access_payload, expires_delta=8640000)
-    refresh_token = AuthService().create_token(refresh_payload, expires_delta=8640000)
+    access_token = auth_service.create_token(access_payload, expires_delta=8640000)
+    refresh_token = auth_service.create_token(refresh_payload, expires_delta=8640000)
 
     if not access_token or not refresh_token:
         raise HTTPException(status_code=500, detail="Token creation failed")
@@ -142,19 +140,19 @@ async def login(request: Request, auth_data: AuthLoginSchema):
             "email": user.email,
             "full_name": user.full_name()
         }
-    return JSONResponse(status_code=201, content=jsonable_encoder(data))
+    return data
 
 
 @router.post("/change-password")
 async def change_password(request: Request, auth_data: AuthChangePasswordSchema):
     user = request.state.user
     password_data = auth_data.dict()
-    verify_password = UserService.verify_password(password_data['old_password'], user.password)
+    verify_password = await UserService.verify_password(password_data['old_password'], user.password)
     if verify_password:
         user_data = {
             "password": password_data['password']
         }
-        await UserRepository(request.state.db).update_user(user_id=user.id, user_data=user_data)
+        await UserRepository(request.state.db).update_user(user_id=user.id, data=user_data)
         return JSONResponse(status_code=200, content={"message": "Пароль изменен успешно!"})
     raise HTTPException(status_code=400, detail="Старый пароль написан не правильно")
 
@@ -177,23 +175,19 @@ async def forgot_password(request: Request, data: AuthForgotPasswordSchema):
                 </body>
             </html>
         """
-        send_message = await BaseService.send_message_to_email(
-            emails_to=[data.email], message=message
-        )
-        if send_message:
-            otp_data = {
-                'email': data.email,
-                'code': code
+        EmailOutboxRepository(db).enqueue(emails_to=[data.email], message=message)
+        otp_data = {
+            'email': data.email,
+            'code': code
+        }
+        otp_repo = OTPRepository(db)
+        otp = await otp_repo.create_data(otp_data)
+        if otp:
+            return {
+                "status": "success",
+                "message": f"OTP success send to email: {otp.email}"
             }
-            otp_repo = OTPRepository(db)
-            otp = await otp_repo.create_data(otp_data)
-            if otp:
-                return {
-                    "status": "success",
-                    "message": f"OTP success send to email: {otp.email}"
-                }
-            raise HTTPException(status_code=500, detail="Create otp failed")
-        raise HTTPException(status_code=500, detail="Send message failed")
+        raise HTTPException(status_code=500, detail="Create otp failed")
     raise HTTPException(status_code=500, detail="Request failed")
 
 
@@ -231,14 +225,28 @@ async def reset_password(request: Request, data: AuthResetPasswordSchema):
         raise HTTPException(status_code=500, detail="Ошибка обновления пользователя")
 
 
+def _absolute_thumbnails(request: Request, thumbnails: dict | None) -> dict | None:
+    if not thumbnails:
+        return thumbnails
+    base_url = str(request.base_url).rstrip("/")
+    return {size: f"{base_url}{path}" for size, path in thumbnails.items()}
+
+
 @router.get("/me", response_model=AuthProfileSchema)
-async def profile(request: Request):
+async def profile(request: Request, response: Response):
     user = request.state.user
     if not user:
         raise HTTPException(status_code=401, detail="User is not authanticate")
+    last_modified = max([user.updated_at, *(role.updated_at for role in user.roles)])
+    etag = make_etag("me", user.id, last_modified, *(role.id for role in user.roles))
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag, last_modified))
     data = {
         "id": user.id,
         "image": f'{str(request.base_url).rstrip("/")}{user.image}' if user.image else 'none',
+        "thumbnails": _absolute_thumbnails(request, user.thumbnails),
         "email": user.email,
         "first_name": user.first_name,
         "last_name": user.last_name,
@@ -246,12 +254,18 @@ async def profile(request: Request):
         "created_at": user.created_at,
         "updated_at": user.updated_at
     }
-    return JSONResponse(status_code=200, content=jsonable_encoder(data))
+    return data
 
 
 @router.post("/logout")
 async def logout(request: Request, response: Response):
     try:
+        token = request.headers.get("Authorization")
+        if token and token.startswith("Bearer "):
+            await auth_service.revoke_token(token[7:], request.state.db)
+        refresh_token = request.cookies.get("refresh_token")
+        if refresh_token:
+            await auth_service.revoke_token(refresh_token, request.state.db)
         response.delete_cookie("access_token")
         response.delete_cookie("refresh_token")
 
@@ -279,14 +293,19 @@ async def profile_update(request: Request, auth_data: AuthProfileUpdateSchema =
         if auth_data.image:
             image_info = await BaseService.upload_image(auth_data.image, "avatars")
             update_data["image"] = image_info['image_path']
-            {str(request.base_url).rstrip("/")}
+            update_data["thumbnails"] = image_info['thumbnails']
 
         user_repo = UserRepository(db)
         profile_updated = await user_repo.patch_user(user.id, update_data)
-        if profile_updated.image:
-            profile_updated.image = f'{str(request.base_url).rstrip("/")}{profile_updated.image}'
+        if profile_updated is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if profile_updated["image"]:
+            profile_updated["image"] = f'{str(request.base_url).rstrip("/")}{profile_updated["image"]}'
+        profile_updated["thumbnails"] = _absolute_thumbnails(request, profile_updated["thumbnails"])
         return AuthProfileSchema.model_validate(profile_updated)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Ошибка в обновлении профиля")
         raise HTTPException(status_code=500, detail=str(e))
@@ -297,16 +316,18 @@ async def update_access_token(request: Request, auth_data: AuthTokenRefreshSchem
     user = request.state.user
     auth_data = auth_data.dict()
     try:
-        verify_token = AuthService().verify_token(auth_data['refresh_token'])
+        verify_token = auth_service.verify_token(auth_data['refresh_token'])
+        if "error" in verify_token or revocation_list.is_revoked(verify_token.get("jti")):
+            raise HTTPException(status_code=401, detail="Refresh token is invalid or revoked")
         if verify_token:
             access_payload = {"user_id": user.id, "type": "access"}
 
-            access_token = AuthService().create_token(access_payload, expires_delta=8640000)
+            access_token = auth_service.create_token(access_payload, expires_delta=8640000)
             data = {
                 "access_token": access_token,
                 "token_type": "access"
             }
-            return JSONResponse(status_code=200, content=jsonable_encoder(data))
+            return data
     except JWTError as e:
         raise HTTPException(status_code=401, detail=e)
 
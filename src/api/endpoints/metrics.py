@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from core.cache import principal_cache
+from core.config import settings
+from core.db import db_instance
+from services.admission import admission_controller
+from services.mail import smtp_pool
+from services.passwords import password_hasher
+from services.reference_data import reference_cache
+from services.revocation import revocation_list
+from services.tokens import token_verifier
+
+
+async def require_metrics_role(request: Request):
+    user = request.state.user
+    if not user:
+        raise HTTPException(status_code=401, detail="User is not authenticated")
+    if not any(role.slug == settings.METRICS_ROLE for role in user.roles):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    responses={404: {"description": "Not found"}},
+    dependencies=[Depends(require_metrics_role)],
+)
+
+
+@router.get("/")
+async def get_metrics(request: Request):
+    return {
+        "startup": getattr(request.app.state, "startup_timings", None),
+        "db_pool": db_instance.pool_stats(),
+        "admission": admission_controller.stats(),
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "smtp": smtp_pool.stats(),
+        "reference_cache": reference_cache.stats(),
+        "token_cache": token_verifier.stats(),
+        "token_revocation": revocation_list.stats(),
+    }
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException, Request
-from sqlalchemy.orm import selectinload
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
-from models.users import User
-from models.tasks import Task
+from core.http_cache import cache_headers, make_etag, not_modified_response
 from repositories.projects import ProjectRepository, ProjectInvitationRepository
+from schemas.pagination import PageSchema, PaginationParams
 from schemas.projects import (
     ProjectCreateSchema, ProjectCreateResponseSchema, ProjectResponseSchema,
     ProjectsResponseSchema,
@@ -18,20 +18,22 @@ router = APIRouter(
 )
 
 
-@router.get('/', response_model=list[ProjectsResponseSchema])
-async def get_projects(request: Request):
+@router.get('/', response_model=PageSchema[ProjectsResponseSchema])
+async def get_projects(request: Request,
+                       page: PaginationParams = Depends(),
+                       owner_id: Optional[int] = None,
+                       title: Optional[str] = None):
     db = request.state.db
     project_repo = ProjectRepository(db)
-    projects = await project_repo.get_all(
-        selectinload(project_repo.model.owner).selectinload(User.roles),
-        selectinload(project_repo.model.participating_users).selectinload(User.roles),
-        selectinload(project_repo.model.tasks).options(
-            selectinload(Task.performer),
-            selectinload(Task.status),
-            selectinload(Task.priority)
+    try:
+        projects, next_cursor = await project_repo.paginate(
+            **page.dict(),
+            filters={"owner_id": owner_id, "title": title},
+            schema=ProjectsResponseSchema
         )
-    )
-    return projects
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": projects, "next_cursor": next_cursor}
 
 
 @router.post('/', response_model=ProjectCreateResponseSchema)
@@ -72,9 +74,7 @@ async def get_received_invitations(request: Request):
     project_invitation_repo = ProjectInvitationRepository(db)
     project_invitations = await project_invitation_repo.get_received_invitations(
         user.id,
-        selectinload(project_invitation_repo.model.project),
-        selectinload(project_invitation_repo.model.invited).selectinload(User.roles),
-        selectinload(project_invitation_repo.model.inviter).selectinload(User.roles),
+        *project_invitation_repo.plan_loader_options(InvitationResponseSchema)
     )
     return project_invitations
 
@@ -119,19 +119,21 @@ async def decline_invitation(request: Request, invitation_id: int):
 async def get_project(request: Request, project_id: int):
     db = request.state.db
     project_repo = ProjectRepository(db)
-    project = await project_repo.get_data_by_id(
-        project_id,
-        selectinload(project_repo.model.owner).selectinload(User.roles),
-        selectinload(project_repo.model.participating_users).selectinload(User.roles),
-        selectinload(project_repo.model.tasks).options(
-            selectinload(Task.performer),
-            selectinload(Task.status),
-            selectinload(Task.priority)
-        )
-    )
-    if not project:
+    version = await project_repo.get_version(project_id)
+    if version is None:
         raise HTTPException(status_code=400, detail="Проект с таким id не найден")
-    return project
+    etag = make_etag("project", project_id, *version)
+    not_modified = not_modified_response(request, etag, version[0])
+    if not_modified:
+        return not_modified
+    project_json = await project_repo.get_project_json(project_id)
+    if project_json is None:
+        raise HTTPException(status_code=400, detail="Проект с таким id не найден")
+    return Response(
+        content=project_json,
+        media_type="application/json",
+        headers=cache_headers(etag, version[0])
+    )
 
 
 @router.delete('/{project_id}')
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from core.http_cache import cache_headers, make_etag, not_modified_response
 from repositories.roles import RolesRepository
+from services.reference_data import reference_cache
+from schemas.pagination import PageSchema, PaginationParams
 from schemas.roles import RoleAddSchema, RoleSchema, RoleUpdateSchema
 
 router = APIRouter(
@@ -12,25 +16,45 @@ router = APIRouter(
 
 @router.get(
         '/',
-        response_model=list[RoleSchema],
+        response_model=PageSchema[RoleSchema],
         # responses={
         #         401: {"model": ErrorResponse},
         #         404: {"model": ErrorResponse},
         #         500: {"model": ErrorResponse},
         #     }
         )
-async def get_roles(request: Request):
+async def get_roles(request: Request,
+                    response: Response,
+                    page: PaginationParams = Depends(),
+                    name: Optional[str] = None,
+                    slug: Optional[str] = None):
     db = request.state.db
     role_repo = RolesRepository(db)
-    roles = await role_repo.get_all()
-    return roles
+    version = reference_cache.table_version(role_repo.model)
+    if version is None:
+        version = await role_repo.get_table_version()
+    last_modified, count = version
+    etag = make_etag("roles", last_modified, count, request.url.query)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag, last_modified))
+    try:
+        roles, next_cursor = await role_repo.paginate(
+            **page.dict(), filters={"name": name, "slug": slug}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": roles, "next_cursor": next_cursor}
 
 
 @router.get('/{role_id}', response_model=RoleSchema)
 async def get_role(request: Request, role_id: int):
     db = request.state.db
     role_repo = RolesRepository(db)
-    role = await role_repo.get_data_by_id(role_id)
+    role = await role_repo.get_cached_by_id(role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
     return role
 
 
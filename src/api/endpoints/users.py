@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Request
-from sqlalchemy.orm import selectinload
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
+from core.http_cache import cache_headers, make_etag, not_modified_response
 from repositories.users import UserRepository
 from services.users import UserService
-from schemas.users import UserAddSchema, UserResponseSchema, UserPatchSchema
+from schemas.batch import BatchDeleteSchema, BatchRequestSchema, BatchResponseSchema
+from schemas.pagination import PageSchema, PaginationParams
+from schemas.users import UserAddSchema, UserBatchPatchItemSchema, UserResponseSchema, UserPatchSchema
 
 router = APIRouter(
     prefix="/users",
@@ -13,22 +16,120 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=list[UserResponseSchema])
-async def get_users(request: Request):
+@router.get("/", response_model=PageSchema[UserResponseSchema])
+async def get_users(request: Request,
+                    page: PaginationParams = Depends(),
+                    email: Optional[str] = None,
+                    first_name: Optional[str] = None,
+                    last_name: Optional[str] = None):
     db = request.state.db
     user_repo = UserRepository(db)
-    users = await user_repo.get_all(selectinload(user_repo.model.roles))
-    return users
+    filters = {"email": email, "first_name": first_name, "last_name": last_name}
+    try:
+        users, next_cursor = await user_repo.paginate(
+            **page.dict(), filters=filters, schema=UserResponseSchema
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": users, "next_cursor": next_cursor}
+
+
+@router.post("/batch", response_model=BatchResponseSchema[UserResponseSchema], status_code=207)
+async def create_users_batch(batch: BatchRequestSchema[UserAddSchema],
+                             request: Request):
+    db = request.state.db
+    user_repo = UserRepository(db)
+    user_service = UserService(user_repo)
+    existing = await user_repo.get_ids_by_emails([user.email for user in batch.items])
+    results, accepted, seen = [], [], set()
+    for index, user in enumerate(batch.items):
+        if user.email in existing or user.email in seen:
+            results.append({"index": index, "status": 409, "error": "User with this email already exists"})
+            continue
+        seen.add(user.email)
+        accepted.append((index, user.dict()))
+    created = await user_service.bulk_create_users([data for _, data in accepted])
+    results += [
+        {"index": index, "status": 201, "item": user}
+        for (index, _), user in zip(accepted, created)
+    ]
+    results.sort(key=lambda result: result["index"])
+    return {"results": results}
+
+
+@router.patch("/batch", response_model=BatchResponseSchema[UserResponseSchema], status_code=207)
+async def update_users_batch(batch: BatchRequestSchema[UserBatchPatchItemSchema],
+                             request: Request):
+    db = request.state.db
+    user_repo = UserRepository(db)
+    user_service = UserService(user_repo)
+    emails = [user.email for user in batch.items if user.email]
+    existing = await user_repo.get_ids_by_emails(emails)
+    results, accepted, seen_ids, seen_emails = [], [], set(), set()
+    for index, user in enumerate(batch.items):
+        if user.id in seen_ids:
+            results.append({"index": index, "status": 409, "error": "Duplicate user id in batch"})
+            continue
+        if user.email and (existing.get(user.email, user.id) != user.id or user.email in seen_emails):
+            results.append({"index": index, "status": 409, "error": "User with this email already exists"})
+            continue
+        seen_ids.add(user.id)
+        if user.email:
+            seen_emails.add(user.email)
+        accepted.append((index, user.dict(exclude_unset=True)))
+    updated = await user_service.bulk_update_users([data for _, data in accepted])
+    for (index, _), user in zip(accepted, updated):
+        if user is None:
+            results.append({"index": index, "status": 404, "error": "User not found"})
+        else:
+            results.append({"index": index, "status": 200, "item": user})
+    results.sort(key=lambda result: result["index"])
+    return {"results": results}
+
+
+@router.post("/batch/delete", response_model=BatchResponseSchema[UserResponseSchema], status_code=207)
+async def delete_users_batch(batch: BatchDeleteSchema,
+                             request: Request):
+    db = request.state.db
+    user_repo = UserRepository(db)
+    blocked = await user_repo.get_blocked_ids(batch.ids)
+    results, accepted, seen = [], [], set()
+    for index, user_id in enumerate(batch.ids):
+        if user_id in seen:
+            results.append({"index": index, "status": 409, "error": "Duplicate user id in batch"})
+            continue
+        seen.add(user_id)
+        if user_id in blocked:
+            results.append({"index": index, "status": 409, "error": "User owns projects or has tasks"})
+            continue
+        accepted.append((index, user_id))
+    deleted = await user_repo.bulk_delete([user_id for _, user_id in accepted])
+    for (index, _), user in zip(accepted, deleted):
+        if user is None:
+            results.append({"index": index, "status": 404, "error": "User not found"})
+        else:
+            results.append({"index": index, "status": 200, "item": user})
+    results.sort(key=lambda result: result["index"])
+    return {"results": results}
 
 
 @router.get("/{user_id}", response_model=UserResponseSchema)
 async def get_user_by_id(user_id: int,
-                         request: Request):
+                         request: Request,
+                         response: Response):
     db = request.state.db
     user_repo = UserRepository(db)
-    user = await user_repo.get_data_by_id(user_id, selectinload(user_repo.model.roles))
+    version = await user_repo.get_version(user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    etag = make_etag("user", user_id, *version)
+    not_modified = not_modified_response(request, etag, version[0])
+    if not_modified:
+        return not_modified
+    user = await user_repo.get_projected_by_id(user_id, UserResponseSchema)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    response.headers.update(cache_headers(etag, version[0]))
     return user
 
 
@@ -4,6 +4,7 @@ from .endpoints.users import router as user_router
 from .endpoints.auth import router as auth_router
 from .endpoints.roles import router as role_router
 from .endpoints.projects import router as project_router
+from .endpoints.metrics import router as metrics_router
 
 
 router = APIRouter(prefix="/api")
@@ -11,7 +12,8 @@ router_list = [
     auth_router,
     user_router,
     role_router,
-    project_router
+    project_router,
+    metrics_router
 ]
 
 for r in router_list:
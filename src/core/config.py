@@ -1,4 +1,4 @@
-from typing import List, ClassVar
+from typing import List, ClassVar, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
@@ -17,6 +17,28 @@ class Setting(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
 
+    # Database pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: int = 60
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # fail | warn | create_all (tests only) | off
+    DB_SCHEMA_CHECK: str = "fail"
+
+    # Database read replicas
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_MAX_LAG: float = 5.0
+    DB_REPLICA_HEALTH_INTERVAL: float = 5.0
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0
+    # Carries the last write time to whichever worker serves the next request
+    DB_READ_YOUR_WRITES_COOKIE: str = "db_last_write"
+    # Same-worker fallback for clients that do not send cookies back
+    DB_READ_YOUR_WRITES_CACHE_SIZE: int = 10000
+
     # Smtp Email
     EMAIL_HOST: str
     EMAIL_PORT: int
@@ -25,11 +47,71 @@ class Setting(BaseSettings):
     EMAIL_USE_TLS: bool
     EMAIL_USE_SSL: bool
 
+    # Smtp connection pool
+    EMAIL_POOL_SIZE: int = 4
+    EMAIL_POOL_MAX_MESSAGES: int = 100
+    EMAIL_POOL_IDLE_CHECK: float = 30.0
+
+    # Email outbox
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 2.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BACKOFF: int = 30
+
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    TOKEN_REVOCATION_PRUNE_INTERVAL: int = 3600
+
+    # Password hashing pool: "thread" or "process"
+    PASSWORD_HASHER_EXECUTOR: str = "thread"
+    PASSWORD_HASHER_WORKERS: int = 4
+
+    # Principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # Cross-worker cache invalidation
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_RECONNECT_DELAY: float = 5.0
+
+    # Production server (server.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: Optional[int] = None
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT: int = 60
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_KEEPALIVE: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_ACCESS_LOG: bool = False
+
+    # Admission control
+    ADMISSION_PASSWORD_CONCURRENCY: int = 8
+    ADMISSION_WRITE_CONCURRENCY: int = 32
+    ADMISSION_READ_CONCURRENCY: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 0.5
+    ADMISSION_RETRY_AFTER: int = 1
+    ADMISSION_DB_MAX_WAITING: int = 20
+    ADMISSION_HASHER_MAX_QUEUE: int = 32
+
+    # Batch endpoints
+    BULK_MAX_ITEMS: int = 10000
+
+    # Pagination
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # /api/metrics/ is readable only by users with this role slug
+    METRICS_ROLE: str = "admin"
+
+    # HTTP caching
+    HTTP_CACHE_CONTROL: str = "private, no-cache"
 
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
@@ -38,11 +120,35 @@ class Setting(BaseSettings):
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
 
+    # Media uploads
+    MEDIA_MAX_IMAGE_SIZE: int = 5 * 1024 * 1024
+    MEDIA_UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    # Whole multipart request, checked before parsing: image plus form fields
+    MEDIA_MAX_UPLOAD_REQUEST_SIZE: int = 6 * 1024 * 1024
+    MEDIA_THUMBNAIL_SIZES: List[int] = [64, 256]
+    MEDIA_THUMBNAIL_WORKERS: int = 2
+    # Defaults to media_path/.tmp so moving an upload into place is a rename
+    MEDIA_UPLOAD_TMP_DIR: Optional[Path] = None
+
+    # Media storage: "local" or "s3"
+    MEDIA_STORAGE: str = "local"
+    MEDIA_PUBLIC_BASE_URL: Optional[str] = None
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    S3_REGION: str = "us-east-1"
+    S3_PRESIGNED_URL_EXPIRE: int = 3600
+
     # Database url
     @property
     def DATA_BASE_URL_asyncpg(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def DATA_BASE_DSN(self):
+        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
     @property
     def DATA_BASE_URL_sync(self):
         return f"postgresql+psycopg2://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -52,6 +158,10 @@ class Setting(BaseSettings):
     def media_path(self) -> Path:
         return self.MEDIA_DIR
 
+    @property
+    def upload_tmp_path(self) -> Path:
+        return self.MEDIA_UPLOAD_TMP_DIR or self.media_path / ".tmp"
+
     # env file settings
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,31 +1,278 @@
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+import math
+import time
+import uuid
+from collections import defaultdict
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import AsyncGenerator, Callable, Sequence
+import asyncpg
+from sqlalchemy import event, func, select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from models.base_models import BaseModel
+from core.cache import TTLCache
 from core.config import settings
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def migration_heads() -> set[str]:
+    """Head-ревизии из migrations/versions; alembic нужен только здесь"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(settings.BASE_DIR / "migrations")).get_heads())
+
+
+class PoolMetrics:
+    """Счетчики ожидания соединений из пула"""
+
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.wait_time = Histogram()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool, который учитывает число ожидающих и время ожидания соединения"""
+    metrics: PoolMetrics = PoolMetrics()
+
+    def _do_get(self):
+        self.metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.wait_time.observe(time.perf_counter() - started)
+
+
+def engine_options(metrics: PoolMetrics) -> dict:
+    """Параметры пула и драйвера asyncpg из настроек"""
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    return {
+        # Pool instances are recreated on dispose(), so metrics live on a subclass
+        "poolclass": type("InstrumentedPool", (InstrumentedPool,), {"metrics": metrics}),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": server_settings,
+        },
+    }
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для читающих запросов: round-robin по здоровым репликам,
+    отстающие и недоступные реплики исключаются до следующей проверки
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine]) -> None:
+        self.engines = list(engines)
+        self._healthy = list(engines)
+        self._counter = itertools.count()
+        self._recent_writers = TTLCache(
+            maxsize=settings.DB_READ_YOUR_WRITES_CACHE_SIZE,
+            ttl=settings.DB_READ_YOUR_WRITES_WINDOW
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> AsyncEngine | None:
+        if not self._healthy:
+            return None
+        return self._healthy[next(self._counter) % len(self._healthy)]
+
+    def mark_write(self, user_id: int | None) -> None:
+        if user_id is not None:
+            self._recent_writers.set(user_id, True)
+
+    def is_sticky(self, user_id: int | None) -> bool:
+        return user_id is not None and self._recent_writers.get(user_id) is not None
+
+    @staticmethod
+    def wrote_recently(marker: str | None) -> bool:
+        """
+        Метка последней записи из cookie клиента: пока окно не истекло,
+        чтение идет с primary, какой бы воркер ни обслуживал запрос
+        """
+        try:
+            written_at = float(marker)
+        except (TypeError, ValueError):
+            return False
+        return 0 <= time.time() - written_at < settings.DB_READ_YOUR_WRITES_WINDOW
+
+    @staticmethod
+    def write_marker_cookie(written_at: float) -> str:
+        """Set-Cookie с меткой записи, живет столько же, сколько окно"""
+        max_age = math.ceil(settings.DB_READ_YOUR_WRITES_WINDOW)
+        return (
+            f"{settings.DB_READ_YOUR_WRITES_COOKIE}={written_at:.3f}; "
+            f"Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+        )
+
+    async def check_health(self) -> None:
+        healthy = []
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    lag = await conn.scalar(REPLICA_LAG_QUERY)
+            except Exception as e:
+                logger.warning(f"Replica {engine.url.host} is unavailable: {e}")
+                continue
+            if lag is not None and lag > settings.DB_REPLICA_MAX_LAG:
+                logger.warning(f"Replica {engine.url.host} lags behind by {lag:.1f}s")
+                continue
+            healthy.append(engine)
+        self._healthy = healthy
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_INTERVAL)
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая отправляет чтение на реплику из info["replica"],
+    а запись (flush, INSERT/UPDATE/DELETE) всегда на primary. Запросы,
+    которые реплика (hot standby) выполнить не может - SELECT ... FOR UPDATE
+    и помеченные execution_options(primary=True) - тоже идут на primary
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return super().get_bind(mapper, clause=clause, **kw)
+        if clause is not None and (
+            getattr(clause, "_for_update_arg", None) is not None
+            or clause.get_execution_options().get("primary")
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        replica = self.info.get("replica")
+        router = self.info.get("router")
+        if replica is None or (router and router.is_sticky(self.info.get("user_id"))):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session: Session) -> None:
+    """После записи пользователь некоторое время читает с primary"""
+    if session.info.pop("wrote", False):
+        session.info["written_at"] = time.time()
+        router = session.info.get("router")
+        if router:
+            router.mark_write(session.info.get("user_id"))
+
+
+def use_primary(session) -> None:
+    """Все последующие запросы сессии идут на primary"""
+    session.info.pop("replica", None)
 
 
 class Database:
-    def __init__(self, db_url: str) -> None:
+    def __init__(self, db_url: str, replica_urls: Sequence[str] = ()) -> None:
         """
         Инициализация базы данных
         """
-        self._engine = create_async_engine(db_url)
+        self.pool_metrics = PoolMetrics()
+        self._engine = create_async_engine(db_url, **engine_options(self.pool_metrics))
         """
-        Создаем асинхронный движок базы данных
+        Создаем асинхронный движок базы данных с настроенным пулом соединений
+        """
+        self.replica_router = ReplicaRouter([
+            create_async_engine(url, **engine_options(PoolMetrics()))
+            for url in replica_urls
+        ])
+        """
+        Движки реплик для чтения
         """
         self._async_session_maker = async_sessionmaker(
                                         bind=self._engine,
-                                        expire_on_commit=False)
+                                        expire_on_commit=False,
+                                        sync_session_class=RoutingSession,
+                                        info={"router": self.replica_router})
         """
         Создаем асинхронный sessionmaker для работы с базой данных
         """
 
     async def create_database(self) -> None:
-        """Создаем таблицы в базе данных"""
+        """Создаем таблицы в базе данных (только для тестов, в остальных случаях - alembic)"""
         async with self._engine.begin() as conn:
             await conn.run_sync(BaseModel.metadata.create_all)
 
+    async def check_schema_version(self) -> None:
+        """
+        Сверяем alembic_version с head-ревизиями миграций одним запросом
+        вместо create_all с рефлексией всех таблиц на каждом старте воркера
+        """
+        mode = settings.DB_SCHEMA_CHECK
+        if mode == "off":
+            return
+        if mode == "create_all":
+            await self.create_database()
+            return
+        expected = migration_heads()
+        async with self._engine.connect() as conn:
+            try:
+                result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+                current = set(result.scalars().all())
+            except ProgrammingError:
+                current = set()
+        if current == expected:
+            return
+        message = (
+            f"Database schema revision {sorted(current) or 'none'} does not match "
+            f"migrations head {sorted(expected)}, run 'alembic upgrade head'"
+        )
+        if mode == "fail":
+            raise SchemaVersionError(message)
+        logger.warning(message)
+
+    def pool_stats(self) -> dict:
+        """Текущее состояние пула соединений"""
+        pool = self._engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "waiting": self.pool_metrics.waiting,
+            "wait_time": self.pool_metrics.wait_time.snapshot(),
+        }
+
+    def reset_pools_after_fork(self) -> None:
+        """
+        Сбрасываем пулы primary и всех реплик, унаследованные от мастера:
+        его соединения не закрываются, воркер просто открывает свои
+        """
+        for engine in (self._engine, *self.replica_router.engines):
+            engine.sync_engine.dispose(close=False)
+
     @asynccontextmanager
     async def session(self) -> AsyncGenerator:
         """Асинхронный контекстный менеджер для сессии"""
@@ -40,7 +287,149 @@ class Database:
                 await session.close()
 
 
-db_instance = Database(settings.DATA_BASE_URL_asyncpg)
+class LazySession:
+    """
+    Ленивая сессия: AsyncSession создается только при первом обращении,
+    поэтому запросы без работы с базой не занимают соединение из пула
+    """
+
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+        self._info: dict = {}
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def info(self) -> dict:
+        """info сессии; до создания сессии значения копятся и передаются ей"""
+        if self._session is None:
+            return self._info
+        return self._session.info
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory(info=self._info)
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def close(self) -> None:
+        """Возвращаем соединение в пул, повторное обращение откроет новую сессию"""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+
+class InvalidationBus:
+    """
+    Шина инвалидации кэшей между воркерами без внешнего брокера:
+    события (таблица, первичный ключ) отправляются через NOTIFY внутри
+    транзакции записи и доставляются остальным воркерам только после commit.
+    В своем процессе обработчики вызываются сразу после commit через dispatch
+    """
+
+    def __init__(self, dsn: str, channel: str) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[Callable]] = defaultdict(list)
+        self._tasks: set[asyncio.Task] = set()
+        self._pending_key = f"invalidations:{self.origin}"
+        event.listen(Session, "before_commit", self._send_pending)
+        event.listen(Session, "after_rollback", self._drop_pending)
+
+    def register(self, table: str, handler: Callable) -> None:
+        """handler(pk) может быть обычной функцией или корутиной; pk=None - сбросить все"""
+        self._handlers[table].append(handler)
+
+    async def publish(self, session, table: str, pk) -> None:
+        """
+        Событие откладывается до commit сессии: все события транзакции уходят
+        одним NOTIFY-запросом перед COMMIT. Таблицы без обработчиков пропускаются
+        """
+        if table not in self._handlers:
+            return
+        session.info.setdefault(self._pending_key, set()).add((table, pk))
+
+    def _send_pending(self, session: Session) -> None:
+        pending = session.info.pop(self._pending_key, None)
+        if not pending:
+            return
+        # A table-wide event makes the per-row ones for that table redundant
+        flushed = {table for table, pk in pending if pk is None}
+        events = sorted(
+            ((table, pk) for table, pk in pending if pk is None or table not in flushed),
+            key=str
+        )
+        payloads = [json.dumps({"table": table, "pk": pk, "origin": self.origin}) for table, pk in events]
+        # NOTIFY is not allowed on a hot standby
+        session.execute(
+            select(*(func.pg_notify(self.channel, payload) for payload in payloads))
+            .execution_options(primary=True)
+        )
+
+    def _drop_pending(self, session: Session) -> None:
+        session.info.pop(self._pending_key, None)
+
+    async def dispatch(self, table: str, pk) -> None:
+        for handler in self._handlers.get(table, ()):
+            try:
+                result = handler(pk)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Cache invalidation handler failed for {table}:{pk}")
+
+    async def dispatch_all(self) -> None:
+        for table in list(self._handlers):
+            await self.dispatch(table, None)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Malformed invalidation payload: {payload}")
+            return
+        if event.get("origin") == self.origin:
+            return
+        task = asyncio.create_task(self.dispatch(event["table"], event.get("pk")))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def listen(self) -> None:
+        """Фоновая задача: LISTEN с переподключением; после обрыва кэши сбрасываются целиком"""
+        reconnected = False
+        while True:
+            closed = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.warning(f"Invalidation listener cannot connect: {e}")
+                await asyncio.sleep(settings.CACHE_INVALIDATION_RECONNECT_DELAY)
+                continue
+            try:
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                if reconnected:
+                    # Events sent while we were disconnected are lost
+                    await self.dispatch_all()
+                reconnected = True
+                await closed.wait()
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
+            logger.warning("Invalidation listener connection lost, reconnecting")
+            await asyncio.sleep(settings.CACHE_INVALIDATION_RECONNECT_DELAY)
+
+
+invalidation_bus = InvalidationBus(settings.DATA_BASE_DSN, settings.CACHE_INVALIDATION_CHANNEL)
+
+db_instance = Database(settings.DATA_BASE_URL_asyncpg, settings.DB_REPLICA_URLS)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
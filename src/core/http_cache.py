@@ -0,0 +1,60 @@
+import datetime
+import hashlib
+
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from core.config import settings
+
+# Timestamps are stored as naive TIMEZONE('Asia/Bishkek', now()), UTC+6 without DST
+DB_TIMEZONE = datetime.timezone(datetime.timedelta(hours=6))
+
+
+def make_etag(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def _to_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=DB_TIMEZONE)
+    return value.astimezone(datetime.timezone.utc).replace(microsecond=0)
+
+
+def cache_headers(etag: str, last_modified: datetime.datetime | None = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": settings.HTTP_CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_to_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def is_not_modified(request: Request, etag: str,
+                    last_modified: datetime.datetime | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return _to_utc(last_modified) <= since
+    return False
+
+
+def not_modified_response(request: Request, etag: str,
+                          last_modified: datetime.datetime | None = None) -> Response | None:
+    """304 до загрузки и сериализации тела, если клиент уже имеет эту версию"""
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=cache_headers(etag, last_modified))
+    return None
@@ -0,0 +1,4 @@
+"""Момент старта процесса: модуль импортируется первым в main.py"""
+import time
+
+STARTED = time.perf_counter()
@@ -1,26 +1,122 @@
+from core.startup import STARTED  # first import: IMPORT_TIME counts from here
+
+import asyncio
+import contextlib
+import logging
+import time
 import uvicorn
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
+from middleware.admission_middleware import AdmissionMiddleware
 from middleware.auth_middleware import AuthMiddleware
 from middleware.db_middleware import DBSessionMiddleware
+from middleware.upload_limit_middleware import UploadLimitMiddleware
 from api.routes import router as api_router
 from core.config import settings
-from core.db import db_instance
+from core.cache import principal_cache
+from core.db import db_instance, invalidation_bus
+from models.tasks import Priority, TaskStatus
+from models.tokens import RevokedToken
+from models.users import Role, User
+from services.admission import admission_controller
+from services.images import image_executor
+from services.mail import smtp_pool
+from services.outbox import email_outbox_worker
+from services.passwords import password_hasher
+from services.reference_data import reference_cache
+from services.revocation import revocation_list
+from services.storage import media_storage
+
+IMPORT_TIME = round((time.perf_counter() - STARTED) * 1000, 1)
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def _timed(timings: dict, name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _invalidate_principal(pk):
+    if pk is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(pk)
+
+
+async def _invalidate_roles(pk):
+    # Roles are embedded in every cached principal
+    principal_cache.clear()
+    await reference_cache.reload(Role)
+
+
+invalidation_bus.register(User.__tablename__, _invalidate_principal)
+invalidation_bus.register(Role.__tablename__, _invalidate_roles)
+invalidation_bus.register(TaskStatus.__tablename__, lambda pk: reference_cache.reload(TaskStatus))
+invalidation_bus.register(Priority.__tablename__, lambda pk: reference_cache.reload(Priority))
+invalidation_bus.register(RevokedToken.__tablename__, revocation_list.on_invalidate)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await db_instance.create_database()
+    lifespan_started = time.perf_counter()
+    timings = {"import": IMPORT_TIME}
+    with _timed(timings, "schema_check"):
+        await db_instance.check_schema_version()
+    with _timed(timings, "reference_cache"):
+        await reference_cache.load()
+    with _timed(timings, "revocation_list"):
+        await revocation_list.load()
+    invalidation_listener = asyncio.create_task(invalidation_bus.listen())
+    revocation_pruning = asyncio.create_task(revocation_list.run_pruning())
+    replica_health = None
+    if db_instance.replica_router:
+        replica_health = asyncio.create_task(db_instance.replica_router.run_health_checks())
+    outbox_worker = asyncio.create_task(email_outbox_worker.run())
+    timings["total"] = round(IMPORT_TIME + (time.perf_counter() - lifespan_started) * 1000, 1)
+    app.state.startup_timings = timings
+    logger.info("Startup finished in %s ms: %s", timings["total"],
+                ", ".join(f"{name}={ms}ms" for name, ms in timings.items() if name != "total"))
     yield
+    outbox_worker.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await outbox_worker
+    await smtp_pool.close()
+    for task in (invalidation_listener, revocation_pruning):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if replica_health:
+        replica_health.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await replica_health
+    password_hasher.shutdown()
+    image_executor.shutdown(wait=False, cancel_futures=True)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version="0.0.1",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+app.add_middleware(AuthMiddleware)
+app.add_middleware(
+    DBSessionMiddleware,
+    session_factory=db_instance._async_session_maker,
+    replica_router=db_instance.replica_router
 )
+app.add_middleware(UploadLimitMiddleware, max_body_size=settings.MEDIA_MAX_UPLOAD_REQUEST_SIZE)
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
 
 if settings.CORS_ORIGINS:
     app.add_middleware(
@@ -31,11 +127,13 @@ if settings.CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-app.add_middleware(AuthMiddleware)
-app.add_middleware(DBSessionMiddleware, session_factory=db_instance._async_session_maker)
-
 app.include_router(api_router)
-app.mount("/media", StaticFiles(directory=settings.media_path), name="media")
+if settings.MEDIA_STORAGE == "local" and not settings.MEDIA_PUBLIC_BASE_URL:
+    app.mount("/media", StaticFiles(directory=settings.media_path), name="media")
+else:
+    @app.get("/media/{key:path}", include_in_schema=False)
+    async def media(key: str):
+        return RedirectResponse(await media_storage.url(key))
 
 
 @app.get("/")
@@ -45,4 +143,4 @@ async def root():
 
 if __name__ == '__main__':
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True,
-                workers=1, limit_concurrency=100, limit_max_requests=1000)
+                workers=1, limit_max_requests=1000)
@@ -0,0 +1,38 @@
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import settings
+from services.admission import AdmissionController, Overloaded
+
+
+class AdmissionMiddleware:
+    """Сбрасывает нагрузку 503 + Retry-After до открытия сессии и проверки токена"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = self.controller.group_for(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await group.acquire(settings.ADMISSION_QUEUE_TIMEOUT)
+        except Overloaded:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Service is overloaded, retry later"},
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
@@ -1,18 +1,26 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from services.auth import AuthService
+from services.auth import auth_service
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        token = request.headers.get("Authorization")
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        token = Headers(scope=scope).get("Authorization")
         user = None
         if token:
             if token.startswith("Bearer "):
                 token = token[7:]
-            db = request.state.db
-            user = await AuthService().get_user_from_token(token, db)
-        request.state.user = user
-        response = await call_next(request)
-        return response
+            user = await auth_service.get_user_from_token(token, state["db"])
+        if user is not None:
+            state["db"].info["user_id"] = user.id
+        state["user"] = user
+        await self.app(scope, receive, send)
@@ -1,14 +1,44 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from core.config import settings
+from core.db import LazySession
 
-class DBSessionMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, session_factory):
-        super().__init__(app)
+
+class DBSessionMiddleware:
+    def __init__(self, app: ASGIApp, session_factory, replica_router=None):
+        self.app = app
         self.session_factory = session_factory
+        self.replica_router = replica_router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = LazySession(self.session_factory)
+        if self.replica_router and scope["method"] in ("GET", "HEAD"):
+            cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+            marker = cookies.get(settings.DB_READ_YOUR_WRITES_COOKIE)
+            # A recent write by this client may not have reached the replicas yet
+            if not self.replica_router.wrote_recently(marker):
+                session.info["replica"] = self.replica_router.pick()
+        scope.setdefault("state", {})["db"] = session
+
+        async def send_wrapper(message: Message):
+            # The handler has finished its unit of work once the response
+            # starts, so the connection goes back to the pool before streaming.
+            if message["type"] == "http.response.start":
+                written_at = session.info.get("written_at") if session.started else None
+                await session.close()
+                if written_at is not None and self.replica_router:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie", self.replica_router.write_marker_cookie(written_at)
+                    )
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
-        async with self.session_factory() as session:
-            request.state.db = session
-            response = await call_next(request)
-            return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await session.close()
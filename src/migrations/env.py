@@ -11,6 +11,8 @@ from models.base_models import BaseModel
 from models.users import User, Role
 from models.projects import Project
 from models.tasks import Task, Priority, TaskStatus
+from models.outbox import EmailOutbox
+from models.tokens import RevokedToken
 
 config = context.config
 
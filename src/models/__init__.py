@@ -4,6 +4,8 @@ from .association_tables import association_table, project_participants
 from .users import User, Role
 from .projects import Project
 from .tasks import Task,  TaskStatus, Priority
+from .outbox import EmailOutbox
+from .tokens import RevokedToken
 
 __all__ = [
     'BaseModel',
@@ -13,6 +15,8 @@ __all__ = [
     'Priority',
     'Project',
     'Task',
+    'EmailOutbox',
+    'RevokedToken',
     'association_table',
     'project_participants'
 ]
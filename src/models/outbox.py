@@ -0,0 +1,33 @@
+import datetime
+
+from enum import Enum
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON, Integer, String, Text, text
+
+from .base_models import BaseModel
+
+
+class EmailOutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(BaseModel):
+    __tablename__ = "email_outbox"
+
+    recipients: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    subject: Mapped[str] = mapped_column(String(256), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(32), default=EmailOutboxStatus.PENDING, nullable=False, index=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=text("TIMEZONE('Asia/Bishkek', now())"), index=True
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    sent_at: Mapped[datetime.datetime] = mapped_column(nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, status={self.status})>"
@@ -0,0 +1,17 @@
+import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String
+
+from .base_models import BaseModel
+
+
+class RevokedToken(BaseModel):
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=True, index=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(id={self.id}, jti={self.jti})>"
@@ -1,3 +1,4 @@
+from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List
 from slugify import slugify
@@ -27,6 +28,8 @@ class Role(BaseModel):
 class User(BaseModel):
     email: Mapped[str] = mapped_column(unique=True, nullable=False, index=True)
     image: Mapped[str] = mapped_column(nullable=True, default='')
+    # {size: path} of the avatar thumbnails stored next to image
+    thumbnails: Mapped[dict] = mapped_column(JSON, nullable=True)
     first_name: Mapped[str] = mapped_column(nullable=True, default='', index=True)
     last_name: Mapped[str] = mapped_column(nullable=True, default='', index=True)
     password: Mapped[str] = mapped_column(nullable=True, default='')
@@ -1,15 +1,152 @@
+import base64
+import binascii
+import datetime
+import json
+
+from pydantic import BaseModel as SchemaModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Type
+from sqlalchemy import delete, func, insert, inspect, select, tuple_, update
+from sqlalchemy.orm import selectinload
+from typing import Any, Type, get_args
+from core.db import invalidation_bus, use_primary
 from models.base_models import BaseModel
+from services.reference_data import reference_cache
+
+
+def encode_cursor(value: Any, id: int) -> str:
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(id, int):
+        raise ValueError("Invalid cursor")
+    return value, id
+
+
+def nested_schema(annotation) -> Type[SchemaModel] | None:
+    """Схема внутри аннотации поля: UserSchema, List[UserSchema], Optional[...]"""
+    if isinstance(annotation, type) and issubclass(annotation, SchemaModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def item_value(item: Any, name: str) -> Any:
+    if isinstance(item, dict):
+        return item[name]
+    return getattr(item, name)
 
 
 class BaseRepository:
     model: Type[BaseModel] = None
+    filter_fields: tuple[str, ...] = ()
+    sort_fields: tuple[str, ...] = ("id", "created_at", "updated_at")
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @classmethod
+    def plan_loader_options(cls, schema: Type[SchemaModel], model: Type[BaseModel] = None) -> list:
+        """selectinload только для тех связей, которые есть в схеме ответа"""
+        model = model or cls.model
+        relationships = inspect(model).relationships
+        options = []
+        for name, field in schema.model_fields.items():
+            if name not in relationships:
+                continue
+            loader = selectinload(getattr(model, name))
+            nested = nested_schema(field.annotation)
+            if nested is not None:
+                nested_options = cls.plan_loader_options(nested, relationships[name].mapper.class_)
+                if nested_options:
+                    loader = loader.options(*nested_options)
+            options.append(loader)
+        return options
+
+    @classmethod
+    def schema_projection(cls, schema: Type[SchemaModel], extra: tuple[str, ...] = ("id",)):
+        """
+        Колонки модели и колонки связей первого уровня, нужные схеме ответа.
+        None, если схеме нужны вложенные связи глубже или поля вне колонок
+        """
+        mapper = inspect(cls.model)
+        columns, relations = [], {}
+        for name in dict.fromkeys((*extra, *schema.model_fields)):
+            if name in mapper.columns:
+                columns.append(getattr(cls.model, name))
+            elif name in mapper.relationships:
+                target = mapper.relationships[name].mapper
+                nested = nested_schema(schema.model_fields[name].annotation)
+                if nested is None or any(f not in target.columns for f in nested.model_fields):
+                    return None
+                relations[name] = [getattr(target.class_, f) for f in nested.model_fields]
+            else:
+                return None
+        return columns, relations
+
+    async def _attach_relations(self, rows: list[dict], relations: dict) -> list[dict]:
+        """Одним запросом на связь подтягиваем колонки связанных записей в словари"""
+        relationships = inspect(self.model).relationships
+        ids = [row["id"] for row in rows]
+        for name, target_columns in relations.items():
+            relationship = relationships[name]
+            uselist = relationship.uselist
+            values = {id: [] if uselist else None for id in ids}
+            cached = reference_cache.rows(relationship.mapper.class_)
+            if ids and cached is not None and relationship.secondary is not None:
+                # Reference data is in memory: only the association table is read
+                keys = [column.key for column in target_columns]
+                parent_key = relationship.synchronize_pairs[0][1]
+                target_key = relationship.secondary_synchronize_pairs[0][1]
+                result = await self.db.execute(
+                    select(parent_key, target_key).where(parent_key.in_(ids))
+                )
+                for parent_id, target_id in result.all():
+                    target = cached.get(target_id)
+                    if target is not None:
+                        values[parent_id].append({key: target[key] for key in keys})
+            elif ids:
+                parent_id = self.model.id.label("_parent_id")
+                result = await self.db.execute(
+                    select(parent_id, *target_columns)
+                    .join(getattr(self.model, name))
+                    .where(self.model.id.in_(ids))
+                )
+                for related in result.mappings():
+                    data = dict(related)
+                    key = data.pop("_parent_id")
+                    if uselist:
+                        values[key].append(data)
+                    else:
+                        values[key] = data
+            for row in rows:
+                row[name] = values[row["id"]]
+        return rows
+
+    async def get_projected_by_id(self, id: int, schema: Type[SchemaModel]):
+        """Запись по id в виде словаря для схемы ответа, без ORM-объектов"""
+        projection = self.schema_projection(schema)
+        if projection is None:
+            return await self.get_data_by_id(id, *self.plan_loader_options(schema))
+        columns, relations = projection
+        result = await self.db.execute(select(*columns).where(self.model.id == id))
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        rows = await self._attach_relations([dict(row)], relations)
+        return rows[0]
+
     async def get_all(self, *options):
         stmt = select(self.model)
         if options:
@@ -17,6 +154,79 @@ class BaseRepository:
         result = await self.db.execute(stmt)
         return result.unique().scalars().all()
 
+    def _page_statement(self, stmt, limit: int, after: str | None,
+                        sort: str, filters: dict | None):
+        """Фильтрация и keyset-пагинация по (sort, id) вместо OFFSET"""
+        descending = sort.startswith("-")
+        sort_name = sort.lstrip("-")
+        if sort_name not in self.sort_fields:
+            raise ValueError(f"Sorting by '{sort_name}' is not allowed")
+        sort_column = getattr(self.model, sort_name)
+
+        for key, value in (filters or {}).items():
+            if key not in self.filter_fields:
+                raise ValueError(f"Filtering by '{key}' is not allowed")
+            if value is not None:
+                stmt = stmt.where(getattr(self.model, key) == value)
+
+        if after:
+            value, last_id = decode_cursor(after)
+            if isinstance(value, str) and sort_column.type.python_type is datetime.datetime:
+                value = datetime.datetime.fromisoformat(value)
+            if sort_name == "id":
+                key, bound = self.model.id, last_id
+            else:
+                key, bound = tuple_(sort_column, self.model.id), tuple_(value, last_id)
+            stmt = stmt.where(key < bound if descending else key > bound)
+
+        if descending:
+            stmt = stmt.order_by(sort_column.desc(), self.model.id.desc())
+        else:
+            stmt = stmt.order_by(sort_column.asc(), self.model.id.asc())
+        return stmt.limit(limit + 1), sort_name
+
+    async def paginate(self, *options, limit: int, after: str | None = None,
+                       sort: str = "id", filters: dict | None = None,
+                       schema: Type[SchemaModel] | None = None):
+        """
+        Страница записей. Если передана схема ответа, загружаются только нужные ей данные:
+        колонки и связи первого уровня читаются как словари без построения ORM-объектов,
+        для более глубоких схем связи подгружаются по plan_loader_options
+        """
+        stmt, sort_name = self._page_statement(select(self.model), limit, after, sort, filters)
+        projection = self.schema_projection(schema, extra=("id", sort_name)) if schema else None
+        if projection is not None:
+            columns, relations = projection
+            result = await self.db.execute(stmt.with_only_columns(*columns))
+            rows = [dict(row) for row in result.mappings()]
+            await self._attach_relations(rows[:limit], relations)
+        else:
+            if schema is not None:
+                options = (*self.plan_loader_options(schema), *options)
+            if options:
+                stmt = stmt.options(*options)
+            result = await self.db.execute(stmt)
+            rows = result.unique().scalars().all()
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(item_value(last, sort_name), item_value(last, "id"))
+        return items, next_cursor
+
+    async def get_version(self, id: int) -> tuple | None:
+        """
+        Версия записи для ETag/Last-Modified без загрузки самой записи:
+        кортеж, первый элемент которого - время последнего изменения
+        """
+        result = await self.db.execute(select(self.model.updated_at).where(self.model.id == id))
+        return result.one_or_none()
+
+    async def get_table_version(self) -> tuple:
+        """(max(updated_at), count) таблицы для ETag списков"""
+        result = await self.db.execute(select(func.max(self.model.updated_at), func.count()))
+        return tuple(result.one())
+
     async def get_data_by_id(self, id: int, *options):
         stmt = select(self.model).where(self.model.id == id)
         if options:
@@ -25,34 +235,139 @@ class BaseRepository:
         return result.scalar_one_or_none()
 
     async def create_data(self, data: dict):
+        use_primary(self.db)
         data = self.model(**data)
         self.db.add(data)
         try:
+            await self.db.flush()
+            await invalidation_bus.publish(self.db, self.model.__tablename__, data.id)
             await self.db.commit()
             await self.db.refresh(data)
-            return data
         except Exception as e:
             await self.db.rollback()
             raise e
+        await invalidation_bus.dispatch(self.model.__tablename__, data.id)
+        return data
 
     async def update_data(self, data_id: int, data: dict):
-        get_data = await self.get_data_by_id(data_id)
-        if get_data:
-            for key, value in data.items():
-                setattr(get_data, key, value)
-            try:
-                await self.db.commit()
-            except Exception as e:
+        """Один UPDATE ... RETURNING вместо SELECT -> setattr -> commit -> refresh"""
+        if not data:
+            return await self.get_data_by_id(data_id)
+        use_primary(self.db)
+        stmt = (
+            update(self.model)
+            .where(self.model.id == data_id)
+            .values(**data)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            item = (await self.db.scalars(stmt)).one_or_none()
+            if item is None:
                 await self.db.rollback()
-                raise e
-            await self.db.refresh(get_data)
-            return get_data
-        return None
+                return None
+            await invalidation_bus.publish(self.db, self.model.__tablename__, data_id)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        await invalidation_bus.dispatch(self.model.__tablename__, data_id)
+        return item
 
     async def delete_data(self, data_id: int):
+        use_primary(self.db)
         data = await self.get_data_by_id(data_id)
         if data:
             await self.db.delete(data)
+            await invalidation_bus.publish(self.db, self.model.__tablename__, data_id)
             await self.db.commit()
+            await invalidation_bus.dispatch(self.model.__tablename__, data_id)
             return data
         return None
+
+    async def _get_by_ids(self, ids: list[int], *options) -> dict[int, Any]:
+        if not ids:
+            return {}
+        stmt = (
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        if options:
+            stmt = stmt.options(*options)
+        result = await self.db.execute(stmt)
+        return {item.id: item for item in result.unique().scalars().all()}
+
+    async def _bulk_update_related(self, rows: list[dict]) -> None:
+        """Точка расширения: связи, которые не обновить UPDATE-ом самой таблицы"""
+
+    async def _bulk_delete_related(self, ids: list[int]) -> None:
+        """Точка расширения: чистка связей перед массовым DELETE"""
+
+    async def bulk_create(self, rows: list[dict], *options) -> list:
+        """Один INSERT ... RETURNING на всю пачку и один commit"""
+        if not rows:
+            return []
+        use_primary(self.db)
+        try:
+            result = await self.db.scalars(
+                insert(self.model).returning(self.model.id, sort_by_parameter_order=True),
+                rows
+            )
+            ids = list(result.all())
+            await invalidation_bus.publish(self.db, self.model.__tablename__, None)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        await invalidation_bus.dispatch(self.model.__tablename__, None)
+        created = await self._get_by_ids(ids, *options)
+        return [created[id] for id in ids]
+
+    async def bulk_update(self, rows: list[dict], *options) -> list:
+        """
+        UPDATE по первичному ключу через executemany; строки без "id" в базе
+        пропускаются. Результат выровнен по входу: None - запись не найдена
+        """
+        if not rows:
+            return []
+        use_primary(self.db)
+        ids = [row["id"] for row in rows]
+        existing = set(
+            (await self.db.scalars(select(self.model.id).where(self.model.id.in_(ids)))).all()
+        )
+        found = [row for row in rows if row["id"] in existing]
+        try:
+            if found:
+                await self._bulk_update_related(found)
+                columns = [row for row in found if len(row) > 1]
+                if columns:
+                    await self.db.execute(update(self.model), columns)
+                await invalidation_bus.publish(self.db, self.model.__tablename__, None)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        if found:
+            await invalidation_bus.dispatch(self.model.__tablename__, None)
+        updated = await self._get_by_ids(list(existing), *options)
+        return [updated.get(id) for id in ids]
+
+    async def bulk_delete(self, ids: list[int], *options) -> list:
+        """DELETE ... WHERE id IN (...) одним запросом; None - запись не найдена"""
+        if not ids:
+            return []
+        use_primary(self.db)
+        found = await self._get_by_ids(ids, *options)
+        try:
+            if found:
+                await self._bulk_delete_related(list(found))
+                await self.db.execute(delete(self.model).where(self.model.id.in_(list(found))))
+                await invalidation_bus.publish(self.db, self.model.__tablename__, None)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        if found:
+            await invalidation_bus.dispatch(self.model.__tablename__, None)
+        return [found.get(id) for id in ids]
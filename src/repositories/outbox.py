@@ -0,0 +1,54 @@
+import datetime
+
+from sqlalchemy import func, select
+
+from .base_repository import BaseRepository
+from models.outbox import EmailOutbox, EmailOutboxStatus
+
+
+def db_now():
+    return func.timezone('Asia/Bishkek', func.now())
+
+
+class EmailOutboxRepository(BaseRepository):
+    model = EmailOutbox
+
+    def enqueue(self, emails_to: list, message: str, subject: str = "Test") -> EmailOutbox:
+        """Письмо сохраняется в той же транзакции, что и OTP/приглашение, без commit"""
+        email = self.model(
+            recipients=[str(e) for e in emails_to],
+            subject=subject,
+            body=message
+        )
+        self.db.add(email)
+        return email
+
+    async def claim_batch(self, limit: int) -> list[EmailOutbox]:
+        """Готовые к отправке письма, заблокированные до конца транзакции"""
+        result = await self.db.execute(
+            select(self.model)
+            .where(
+                self.model.status == EmailOutboxStatus.PENDING,
+                self.model.next_attempt_at <= db_now()
+            )
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def mark_sent(email: EmailOutbox) -> None:
+        email.status = EmailOutboxStatus.SENT
+        email.sent_at = db_now()
+        email.last_error = None
+
+    @staticmethod
+    def mark_failed(email: EmailOutbox, error: Exception, max_attempts: int, backoff: int) -> None:
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= max_attempts:
+            email.status = EmailOutboxStatus.FAILED
+        else:
+            delay = datetime.timedelta(seconds=backoff * 2 ** (email.attempts - 1))
+            email.next_attempt_at = db_now() + delay
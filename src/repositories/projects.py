@@ -1,15 +1,107 @@
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import selectinload
 
 from .base_repository import BaseRepository
 from .users import UserRepository
 from schemas.projects import InvitationStatus
+from .outbox import EmailOutboxRepository
 from models.projects import Project, ProjectInvitation
-from services.base_service import BaseService
+
+
+def _timestamps_json(alias: str) -> str:
+    return f"'created_at', {alias}.created_at, 'updated_at', {alias}.updated_at"
+
+
+def _user_json(alias: str) -> str:
+    return f"""json_build_object(
+        'id', {alias}.id, 'email', {alias}.email, 'image', {alias}.image, 'thumbnails', {alias}.thumbnails,
+        'first_name', {alias}.first_name, 'last_name', {alias}.last_name,
+        'roles', COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', r.id, 'name', r.name, 'slug', r.slug, {_timestamps_json('r')}
+            ))
+            FROM roles r JOIN association_table a ON a.roles_id = r.id
+            WHERE a.users_id = {alias}.id
+        ), '[]'::json)
+    )"""
+
+
+# ProjectResponseSchema built by Postgres in a single statement
+PROJECT_DETAIL_JSON = text(f"""
+SELECT json_build_object(
+    'id', p.id,
+    'title', p.title,
+    'owner', (SELECT {_user_json('o')} FROM users o WHERE o.id = p.owner_id),
+    'participating_users', COALESCE((
+        SELECT json_agg({_user_json('u')})
+        FROM users u JOIN project_participants pp ON pp.user_id = u.id
+        WHERE pp.project_id = p.id
+    ), '[]'::json),
+    'tasks', COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', t.id, 'title', t.title, 'text', t.text, 'deadline', t.deadline,
+            'performer', (SELECT {_user_json('pf')} FROM users pf WHERE pf.id = t.performer_id),
+            'status', (
+                SELECT json_build_object('id', s.id, 'title', s.title, 'slug', s.slug, {_timestamps_json('s')})
+                FROM task_statuses s WHERE s.id = t.status_id
+            ),
+            'priority', (
+                SELECT json_build_object('id', pr.id, 'title', pr.title, 'slug', pr.slug, {_timestamps_json('pr')})
+                FROM priorities pr WHERE pr.id = t.priority_id
+            ),
+            {_timestamps_json('t')}
+        ))
+        FROM tasks t WHERE t.project_id = p.id
+    ), '[]'::json),
+    {_timestamps_json('p')}
+)::text
+FROM projects p
+WHERE p.id = :project_id
+""")
+
+PROJECT_VERSION = text("""
+SELECT
+    GREATEST(
+        p.updated_at,
+        (SELECT max(t.updated_at) FROM tasks t WHERE t.project_id = p.id),
+        (SELECT max(u.updated_at) FROM users u
+         WHERE u.id = p.owner_id
+            OR u.id IN (SELECT pp.user_id FROM project_participants pp WHERE pp.project_id = p.id)
+            OR u.id IN (SELECT t.performer_id FROM tasks t WHERE t.project_id = p.id)),
+        (SELECT max(r.updated_at) FROM roles r),
+        (SELECT max(s.updated_at) FROM task_statuses s
+         WHERE s.id IN (SELECT t.status_id FROM tasks t WHERE t.project_id = p.id)),
+        (SELECT max(pr.updated_at) FROM priorities pr
+         WHERE pr.id IN (SELECT t.priority_id FROM tasks t WHERE t.project_id = p.id))
+    ) AS last_modified,
+    (SELECT count(*) FROM tasks t WHERE t.project_id = p.id) AS tasks,
+    -- Membership rows have no timestamps: swapping one participant for another
+    -- changes neither a count nor max(updated_at), so compare the ids themselves
+    ARRAY(
+        SELECT pp.user_id FROM project_participants pp
+        WHERE pp.project_id = p.id ORDER BY pp.user_id
+    ) AS participants
+FROM projects p
+WHERE p.id = :project_id
+""")
 
 
 class ProjectRepository(BaseRepository):
     model = Project
+    filter_fields = ("owner_id", "title")
+
+    async def get_version(self, id: int) -> tuple | None:
+        """Последнее изменение всего графа проекта, число задач и id участников"""
+        result = await self.db.execute(PROJECT_VERSION, {"project_id": id})
+        return result.one_or_none()
+
+    async def get_project_json(self, project_id: int) -> bytes | None:
+        """Проект со всеми связями в виде готового JSON за один запрос"""
+        result = await self.db.execute(PROJECT_DETAIL_JSON, {"project_id": project_id})
+        project_json = result.scalar_one_or_none()
+        if project_json is None:
+            return None
+        return project_json.encode()
 
     async def create_project(self, project_data: dict):
         user_repo = UserRepository(self.db)
@@ -63,12 +155,10 @@ class ProjectInvitationRepository(BaseRepository):
                     </body>
                 </html>
             """
+        EmailOutboxRepository(self.db).enqueue([invited.email], message)
         try:
             await self.db.commit()
             await self.db.refresh(project_invitation)
-            send_message = await BaseService.send_message_to_email([invited.email], message)
-            if not send_message:
-                raise ValueError("Сервер не смог отправить увидомление")
             return project_invitation
         except Exception as e:
             await self.db.rollback()
@@ -1,11 +1,16 @@
-from sqlalchemy import select
 from .base_repository import BaseRepository
 from models.users import Role
+from services.reference_data import reference_cache
 
 
 class RolesRepository(BaseRepository):
     model = Role
+    filter_fields = ("name", "slug")
 
-    async def get_data_by_slug(self, slug: str):
-        result = await self.db.execute(select(self.model).where(self.model.slug == slug))
-        return result.scalar_one_or_none()
+    async def get_data_by_slug(self, slug: str) -> dict | None:
+        """Словарь колонок роли (см. ReferenceCache.fetch_many), а не ORM-объект"""
+        return await reference_cache.fetch(self.db, self.model, "slug", slug)
+
+    async def get_cached_by_id(self, id: int) -> dict | None:
+        """Словарь колонок роли (см. ReferenceCache.fetch_many), а не ORM-объект"""
+        return await reference_cache.fetch(self.db, self.model, "id", id)
@@ -2,28 +2,23 @@ from sqlalchemy import select
 
 from .base_repository import BaseRepository
 from models.tasks import Task, TaskStatus, Priority
+from services.reference_data import reference_cache
 
 
 class TaskStatusRepository(BaseRepository):
     model = TaskStatus
 
-    async def get_status_by_slug(self, slug: str):
-        result = await self.db.execute(
-            select(self.model)
-            .where(self.model.slug == slug)
-        )
-        return result.scalar_one_or_none()
+    async def get_status_by_slug(self, slug: str) -> dict | None:
+        """Словарь колонок (см. ReferenceCache.fetch_many), а не ORM-объект"""
+        return await reference_cache.fetch(self.db, self.model, "slug", slug)
 
 
 class PriorityRepository(BaseRepository):
     model = Priority
 
-    async def get_priority_by_slug(self, slug: str):
-        result = await self.db.execute(
-            select(self.model)
-            .where(self.model.slug == slug)
-        )
-        return result.scalar_one_or_none()
+    async def get_priority_by_slug(self, slug: str) -> dict | None:
+        """Словарь колонок (см. ReferenceCache.fetch_many), а не ORM-объект"""
+        return await reference_cache.fetch(self.db, self.model, "slug", slug)
 
 
 class TaskRepository(BaseRepository):
@@ -0,0 +1,30 @@
+import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from .base_repository import BaseRepository
+from .outbox import db_now
+from models.tokens import RevokedToken
+
+
+class RevokedTokenRepository(BaseRepository):
+    model = RevokedToken
+
+    async def add(self, jti: str, user_id: int | None, expires_at: datetime.datetime) -> None:
+        """Без commit: вызывающий коммитит вместе с уведомлением других воркеров"""
+        await self.db.execute(
+            insert(self.model)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[self.model.jti])
+        )
+
+    async def get_active_jtis(self) -> list[str]:
+        result = await self.db.scalars(
+            select(self.model.jti).where(self.model.expires_at > db_now())
+        )
+        return list(result.all())
+
+    async def delete_expired(self) -> None:
+        await self.db.execute(delete(self.model).where(self.model.expires_at <= db_now()))
+        await self.db.commit()
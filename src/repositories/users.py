@@ -1,16 +1,22 @@
-from typing import List, Any
-from sqlalchemy import select
+from typing import Any
+from sqlalchemy import delete, func, insert, or_, select, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic.networks import EmailStr
 
+from core.db import invalidation_bus, use_primary
 from models.users import User, Role
+from models.projects import Project, ProjectInvitation
+from models.tasks import Task
+from models.association_tables import association_table, project_participants
 from services.users import UserService
+from services.reference_data import reference_cache
 from .base_repository import BaseRepository
 
 
 class UserRepository(BaseRepository):
     model = User
+    filter_fields = ("email", "first_name", "last_name")
 
     async def get_data_by_id(self, id: int, *options):
         stmt = (
@@ -23,6 +29,80 @@ class UserRepository(BaseRepository):
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def _get_by_ids(self, ids: list[int], *options) -> dict[int, User]:
+        return await super()._get_by_ids(ids, selectinload(User.roles), *options)
+
+    async def _bulk_update_related(self, rows: list[dict]) -> None:
+        """Замена ролей пачкой: один DELETE и один INSERT executemany"""
+        roles_by_user = {
+            row["id"]: list(dict.fromkeys(row.pop("roles")))
+            for row in rows if row.get("roles") is not None
+        }
+        for row in rows:
+            row.pop("roles", None)
+        if not roles_by_user:
+            return
+        role_ids = {id for ids in roles_by_user.values() for id in ids}
+        known = set()
+        if role_ids:
+            known = set((await self.db.scalars(select(Role.id).where(Role.id.in_(role_ids)))).all())
+        await self.db.execute(
+            delete(association_table)
+            .where(association_table.c.users_id.in_(list(roles_by_user)))
+        )
+        links = [
+            {"users_id": user_id, "roles_id": role_id}
+            for user_id, ids in roles_by_user.items()
+            for role_id in ids if role_id in known
+        ]
+        if links:
+            await self.db.execute(insert(association_table), links)
+        await self._touch(list(roles_by_user))
+
+    async def _bulk_delete_related(self, ids: list[int]) -> None:
+        await self.db.execute(delete(association_table).where(association_table.c.users_id.in_(ids)))
+        await self.db.execute(delete(project_participants).where(project_participants.c.user_id.in_(ids)))
+        await self.db.execute(
+            delete(ProjectInvitation).where(
+                or_(ProjectInvitation.invited_id.in_(ids), ProjectInvitation.inviter_id.in_(ids))
+            )
+        )
+
+    async def get_blocked_ids(self, ids: list[int]) -> set[int]:
+        """Пользователи с проектами или задачами: owner_id и performer_id обязательны"""
+        owners = select(Project.owner_id).where(Project.owner_id.in_(ids))
+        performers = select(Task.performer_id).where(Task.performer_id.in_(ids))
+        result = await self.db.scalars(owners.union(performers))
+        return set(result.all())
+
+    async def get_ids_by_emails(self, emails: list[str]) -> dict[str, int]:
+        if not emails:
+            return {}
+        result = await self.db.execute(
+            select(self.model.email, self.model.id).where(self.model.email.in_(emails))
+        )
+        return dict(result.all())
+
+    async def get_version(self, id: int) -> tuple | None:
+        """updated_at пользователя и его ролей: смена ролей тоже меняет версию"""
+        result = await self.db.execute(
+            select(
+                self.model.updated_at,
+                func.max(Role.updated_at),
+                func.array_agg(Role.id)
+            )
+            .select_from(self.model)
+            .outerjoin(association_table, association_table.c.users_id == self.model.id)
+            .outerjoin(Role, Role.id == association_table.c.roles_id)
+            .where(self.model.id == id)
+            .group_by(self.model.id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        updated_at, roles_updated_at, role_ids = row
+        return max(updated_at, roles_updated_at or updated_at), tuple(sorted(filter(None, role_ids)))
+
     async def get_users_by_ids(self, user_ids: list[int]):
         if not user_ids:
             return []
@@ -41,7 +121,7 @@ class UserRepository(BaseRepository):
         if user is None:
             return None
 
-        verify_password = UserService.verify_password(
+        verify_password = await UserService.verify_password(
             password=password,
             hashed_password=user.password
         )
@@ -49,58 +129,99 @@ class UserRepository(BaseRepository):
             return None
         return user
 
-    async def _set_roles_by_ids(self, user: User, ids: List[int]) -> None:
-        if ids is None:
-            return
-        ids = list(dict.fromkeys(ids))
-        if ids:
-            res = await self.db.execute(select(Role).where(Role.id.in_(ids)))
-            roles = list(res.scalars().all())
-        else:
-            roles = []
-        user.roles = roles
-
-    async def update_user(self, user_id: int, data: dict[str, Any]) -> User | None:
-        user = await self.get_data_by_id(user_id)
-        if not user:
-            return None
-        try:
-            for key in ("email", "first_name", "last_name", "password"):
-                if key in data:
-                    val = data[key]
-                    if key == "password" and val:
-                        val = UserService.hash_password(val)
-                    setattr(user, key, val)
-
-            await self._set_roles_by_ids(user, data.get("roles"))
-
-            await self.db.commit()
-        except SQLAlchemyError:
-            await self.db.rollback()
-            raise
-        return await self.get_data_by_id(user_id)
-
-    async def patch_user(self, user_id: int, data: dict[str, Any]) -> User | None:
-        user = await self.get_data_by_id(user_id)
-        if not user:
-            return None
+    async def _touch(self, ids: list[int]) -> dict[int, Any]:
+        """
+        Сдвигаем updated_at без изменения колонок: связи с ролями своих
+        отметок времени не имеют, а Last-Modified берется из updated_at
+        """
+        updated_at = self.model.__table__.c.updated_at
+        result = await self.db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(updated_at=updated_at.onupdate.arg)
+            .returning(self.model.id, updated_at)
+        )
+        return dict(result.all())
+
+    async def _get_roles(self, ids: list[int]) -> list[dict]:
+        """Роли из справочного кэша (копии словарей); запрос в базу только при промахе"""
+        return await reference_cache.fetch_many(self.db, Role, "id", ids)
+
+    async def _update_user(self, user_id: int, values: dict[str, Any],
+                           role_ids: list[int] | None) -> dict | None:
+        """
+        Один UPDATE ... RETURNING вместо SELECT -> setattr -> commit -> refresh;
+        связи с ролями переписываются только если набор ролей изменился
+        """
+        use_primary(self.db)
+        columns = self.model.__table__.columns
         try:
-            if "password" in data:
-                pwd = data.pop("password")
-                if pwd:
-                    user.password = UserService.hash_password(pwd)
-
-            if "roles" in data:
-                await self._set_roles_by_ids(user, data.pop("roles"))
-
-            for key, value in data.items():
-                setattr(user, key, value)
-
+            if values:
+                stmt = (
+                    update(self.model)
+                    .where(self.model.id == user_id)
+                    .values(**values)
+                    .returning(*columns)
+                )
+            else:
+                stmt = select(*columns).where(self.model.id == user_id)
+            row = (await self.db.execute(stmt)).mappings().one_or_none()
+            if row is None:
+                await self.db.rollback()
+                return None
+
+            current = list(await self.db.scalars(
+                select(association_table.c.roles_id)
+                .where(association_table.c.users_id == user_id)
+            ))
+            if role_ids is None:
+                roles = await self._get_roles(current)
+            else:
+                roles = await self._get_roles(list(dict.fromkeys(role_ids)))
+                target = [role["id"] for role in roles]
+                removed = set(current) - set(target)
+                added = [id for id in target if id not in current]
+                if removed:
+                    await self.db.execute(
+                        delete(association_table)
+                        .where(association_table.c.users_id == user_id)
+                        .where(association_table.c.roles_id.in_(removed))
+                    )
+                if added:
+                    await self.db.execute(
+                        insert(association_table),
+                        [{"users_id": user_id, "roles_id": id} for id in added]
+                    )
+                if (removed or added) and not values:
+                    touched = await self._touch([user_id])
+                    row = {**row, "updated_at": touched[user_id]}
+
+            await invalidation_bus.publish(self.db, self.model.__tablename__, user_id)
             await self.db.commit()
         except SQLAlchemyError:
             await self.db.rollback()
             raise
-        return await self.get_data_by_id(user_id)
+        await invalidation_bus.dispatch(self.model.__tablename__, user_id)
+        return {**row, "roles": roles}
+
+    async def update_user(self, user_id: int, data: dict[str, Any]) -> dict | None:
+        values = {}
+        for key in ("email", "first_name", "last_name", "password"):
+            if key in data:
+                val = data[key]
+                if key == "password" and val:
+                    val = await UserService.hash_password(val)
+                values[key] = val
+        return await self._update_user(user_id, values, data.get("roles"))
+
+    async def patch_user(self, user_id: int, data: dict[str, Any]) -> dict | None:
+        data = data.copy()
+        role_ids = data.pop("roles", None)
+        pwd = data.pop("password", None)
+        values = {key: value for key, value in data.items() if key in self.model.__table__.columns}
+        if pwd:
+            values["password"] = await UserService.hash_password(pwd)
+        return await self._update_user(user_id, values, role_ids)
 
     async def get_user_by_email(self, email: EmailStr):
         result = await self.db.execute(select(self.model).where(self.model.email == email))
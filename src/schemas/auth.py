@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from typing_extensions import Self
 from pydantic import BaseModel, model_validator
@@ -11,6 +11,7 @@ class AuthProfileSchema(BaseModel):
     id: int
     email: EmailStr
     image: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None
     first_name: str
     last_name: str
     roles: Optional[List[RoleSchema]] = None
@@ -21,6 +22,25 @@ class AuthProfileSchema(BaseModel):
         from_attributes = True
 
 
+class AuthPrincipalSchema(BaseModel):
+    id: int
+    email: str
+    image: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    password: Optional[str] = None
+    roles: List[RoleSchema] = []
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
 class AuthProfileUpdateSchema:
     def __init__(
         self,
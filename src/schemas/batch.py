@@ -0,0 +1,25 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class BatchRequestSchema(BaseModel, Generic[T]):
+    items: List[T] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BatchDeleteSchema(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BatchItemSchema(BaseModel, Generic[T]):
+    index: int
+    status: int
+    item: Optional[T] = None
+    error: Optional[str] = None
+
+
+class BatchResponseSchema(BaseModel, Generic[T]):
+    results: List[BatchItemSchema[T]]
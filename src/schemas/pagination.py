@@ -0,0 +1,27 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+from fastapi import Query
+
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class PageSchema(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PaginationParams:
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        after: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+        sort: str = Query("id", description="Sort field, prefix with '-' for descending order"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.sort = sort
+
+    def dict(self):
+        return {"limit": self.limit, "after": self.after, "sort": self.sort}
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 from pydantic.networks import EmailStr
 
@@ -22,6 +22,7 @@ class UserResponseSchema(BaseModel):
     id: int
     email: EmailStr
     image: str = None
+    thumbnails: Optional[Dict[str, str]] = None
     first_name: str
     last_name: str
     roles: List[RoleSchema] = []
@@ -39,3 +40,8 @@ class UserPatchSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserBatchPatchItemSchema(UserPatchSchema):
+    id: int
+
@@ -0,0 +1,134 @@
+import asyncio
+from typing import Callable
+
+from core.config import settings
+from core.db import db_instance
+from services.passwords import password_hasher
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def db_saturated() -> bool:
+    return db_instance.pool_metrics.waiting >= settings.ADMISSION_DB_MAX_WAITING
+
+
+def hasher_saturated() -> bool:
+    return password_hasher.queued >= settings.ADMISSION_HASHER_MAX_QUEUE
+
+
+class Overloaded(Exception):
+    pass
+
+
+class RouteGroup:
+    """
+    Бюджет одновременных запросов для группы маршрутов. Сверх бюджета
+    запрос ждет не дольше queue_timeout в очереди ограниченной длины
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int,
+                 match: Callable[[str, str], bool],
+                 pressure: tuple[Callable[[], bool], ...] = ()) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.match = match
+        self.pressure = pressure
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def overloaded(self) -> bool:
+        return any(check() for check in self.pressure)
+
+    async def acquire(self, timeout: float) -> None:
+        if self.overloaded():
+            self.shed += 1
+            raise Overloaded(self.name)
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(self.name)
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise Overloaded(self.name)
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.running += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+def _is_password_route(method: str, path: str) -> bool:
+    if method != "POST" and not (method == "PATCH" and path == "/api/users/batch"):
+        return False
+    return path in (
+        "/api/auth/register",
+        "/api/auth/login",
+        "/api/auth/change-password",
+        "/api/auth/reset-password",
+        "/api/users/",
+        "/api/users/batch",
+    )
+
+
+class AdmissionController:
+    """Выбор группы по маршруту; первая совпавшая группа принимает запрос"""
+
+    def __init__(self, groups: tuple[RouteGroup, ...]) -> None:
+        self.groups = groups
+
+    def group_for(self, method: str, path: str) -> RouteGroup | None:
+        if not path.startswith("/api/") or path.startswith("/api/metrics"):
+            return None
+        for group in self.groups:
+            if group.match(method, path):
+                return group
+        return None
+
+    def stats(self) -> dict:
+        return {group.name: group.stats() for group in self.groups}
+
+
+admission_controller = AdmissionController((
+    RouteGroup(
+        "password",
+        concurrency=settings.ADMISSION_PASSWORD_CONCURRENCY,
+        max_queue=settings.ADMISSION_PASSWORD_CONCURRENCY,
+        match=_is_password_route,
+        pressure=(hasher_saturated, db_saturated),
+    ),
+    RouteGroup(
+        "write",
+        concurrency=settings.ADMISSION_WRITE_CONCURRENCY,
+        max_queue=settings.ADMISSION_WRITE_CONCURRENCY,
+        match=lambda method, path: method not in READ_METHODS,
+        pressure=(db_saturated,),
+    ),
+    RouteGroup(
+        "read",
+        concurrency=settings.ADMISSION_READ_CONCURRENCY,
+        max_queue=settings.ADMISSION_READ_CONCURRENCY,
+        match=lambda method, path: True,
+        pressure=(db_saturated,),
+    ),
+))
@@ -1,12 +1,21 @@
 import datetime
 import random
 import urllib.parse
+import uuid
 
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import principal_cache
 from core.config import settings
+from core.db import invalidation_bus, use_primary
+from core.http_cache import DB_TIMEZONE
+from models.tokens import RevokedToken
+from repositories.tokens import RevokedTokenRepository
 from repositories.users import UserRepository, BaseRepository
+from schemas.auth import AuthPrincipalSchema
+from services.revocation import revocation_list
+from services.tokens import token_codec, token_verifier
 
 
 class AuthService(BaseRepository):
@@ -16,28 +25,59 @@ class AuthService(BaseRepository):
 
     def create_token(self, data: dict, expires_delta: int = None, type: str = None) -> str:
         to_encode = data.copy()
+        to_encode.setdefault("jti", uuid.uuid4().hex)
         if expires_delta:
             expire = datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_delta)
             to_encode.update({"exp": int(expire.timestamp())})
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return token_codec.encode(to_encode)
 
     def verify_token(self, token: str) -> dict:
         try:
-            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            return token_verifier.verify(token)
         except JWTError as e:
             return {'error': e}
 
-    @classmethod
-    async def get_user_from_token(cls, token: str, db: AsyncSession) -> dict:
-        payload = cls().verify_token(token)
-        if payload:
+    async def get_user_from_token(self, token: str, db: AsyncSession) -> AuthPrincipalSchema | None:
+        payload = self.verify_token(token)
+        if payload and not revocation_list.is_revoked(payload.get("jti")):
             user_id = payload.get("user_id")
             if user_id:
+                principal = principal_cache.get(user_id)
+                if principal is not None:
+                    return principal
                 user_repo = UserRepository(db)
                 user = await user_repo.get_data_by_id(user_id)
-                return user
+                if user:
+                    principal = AuthPrincipalSchema.model_validate(user)
+                    principal_cache.set(user_id, principal)
+                return principal
         return None
 
+    async def revoke_token(self, token: str, db: AsyncSession) -> bool:
+        """Отзыв токена до истечения exp; токены без jti отозвать нельзя"""
+        payload = self.verify_token(token)
+        jti = payload.get("jti")
+        if "error" in payload or not jti:
+            return False
+        if "exp" in payload:
+            expires_at = datetime.datetime.fromtimestamp(payload["exp"], DB_TIMEZONE)
+        else:
+            expires_at = datetime.datetime.now(DB_TIMEZONE) + datetime.timedelta(
+                minutes=settings.JWT_REFRESH_TOKEN_EXPIRE_MINUTES
+            )
+        use_primary(db)
+        try:
+            await RevokedTokenRepository(db).add(
+                jti, payload.get("user_id"), expires_at.replace(tzinfo=None)
+            )
+            await invalidation_bus.publish(db, RevokedToken.__tablename__, jti)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        await invalidation_bus.dispatch(RevokedToken.__tablename__, jti)
+        return True
+
     @staticmethod
     def generate_google_oauth_redirect_uri():
         query_params = {
@@ -59,6 +99,9 @@ class AuthService(BaseRepository):
         return f"{base_url}?{query_string}"
 
 
+auth_service = AuthService()
+
+
 class OTPService:
 
     @staticmethod
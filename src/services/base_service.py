@@ -1,24 +1,12 @@
-import shutil
-import uuid
+import asyncio
 
 from fastapi import UploadFile, HTTPException, File
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
-from pathlib import Path
 from pydantic.networks import EmailStr
 
 from core.config import settings
-
-conf = ConnectionConfig(
-    MAIL_USERNAME = settings.EMAIL_USER,
-    MAIL_PASSWORD = settings.EMAIL_PASSWORD,
-    MAIL_FROM = settings.EMAIL_USER,
-    MAIL_PORT = settings.EMAIL_PORT,
-    MAIL_SERVER = settings.EMAIL_HOST,
-    MAIL_STARTTLS = settings.EMAIL_USE_TLS,
-    MAIL_SSL_TLS = settings.EMAIL_USE_SSL,
-    USE_CREDENTIALS = True,
-    VALIDATE_CERTS = True
-)
+from services.images import IMAGE_CONTENT_TYPES, generate_thumbnails, stream_image_to_disk
+from services.mail import build_email_message, smtp_pool
+from services.storage import media_storage
 
 
 class BaseService:
@@ -28,29 +16,35 @@ class BaseService:
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="Only image files allowed")
 
-        media_dir: Path = settings.media_path / image_path
-        media_dir.mkdir(parents=True, exist_ok=True)
-
-        filename = f"{uuid.uuid4().hex}_{file.filename}"
-        file_path = media_dir / filename
-
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        return {"image_path": f"/media/{image_path}/{filename}"}
+        image = await stream_image_to_disk(file, settings.upload_tmp_path)
+
+        # Content-addressed key: the same image uploaded twice is stored once
+        stem = f"{image_path}/{image.digest[:2]}/{image.digest}"
+        key = f"{stem}{image.extension}"
+        thumbnail_keys = {
+            str(size): f"{stem}_{size}{image.extension}" for size in settings.MEDIA_THUMBNAIL_SIZES
+        }
+
+        if await media_storage.exists(key):
+            await asyncio.to_thread(image.path.unlink, missing_ok=True)
+        else:
+            thumbnails = await generate_thumbnails(image.path)
+            content_type = IMAGE_CONTENT_TYPES[image.extension]
+            for size, thumbnail in thumbnails.items():
+                await media_storage.save(thumbnail, thumbnail_keys[str(size)], content_type)
+            await media_storage.save(image.path, key, content_type)
+
+        return {
+            "image_path": f"/media/{key}",
+            "thumbnails": {size: f"/media/{k}" for size, k in thumbnail_keys.items()}
+        }
 
     @staticmethod
     async def send_message_to_email(emails_to: list, message: str) -> bool:
         recipients = [str(e) for e in emails_to]
-        send_message = MessageSchema(
-            subject="Test",
-            recipients=recipients,
-            body=message,
-            subtype=MessageType.html
-        )
+        send_message = build_email_message(recipients, "Test", message)
         try:
-            fm = FastMail(conf)
-            await fm.send_message(send_message)
+            await smtp_pool.send_message(send_message)
             return True
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Email send failed: {e}")
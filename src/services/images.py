@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image, UnidentifiedImageError
+
+from core.config import settings
+
+image_executor = ThreadPoolExecutor(
+    max_workers=settings.MEDIA_THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+)
+
+
+IMAGE_CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+def detect_image_extension(header: bytes) -> str | None:
+    """Тип изображения по сигнатуре файла, а не по content-type клиента"""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+class StreamedImage:
+    def __init__(self, path: Path, digest: str, extension: str, size: int) -> None:
+        self.path = path
+        self.digest = digest
+        self.extension = extension
+        self.size = size
+
+
+def copy_upload(source: BinaryIO, target: Path) -> tuple[str, str, int]:
+    """Копия загрузки кусками с проверкой сигнатуры и размера; вызывается в потоке"""
+    digest = hashlib.sha256()
+    extension = None
+    size = 0
+    with open(target, "wb") as buffer:
+        while chunk := source.read(settings.MEDIA_UPLOAD_CHUNK_SIZE):
+            if extension is None:
+                extension = detect_image_extension(chunk)
+                if extension is None:
+                    raise HTTPException(status_code=400, detail="Only image files allowed")
+            size += len(chunk)
+            if size > settings.MEDIA_MAX_IMAGE_SIZE:
+                raise HTTPException(status_code=413, detail="Image is too large")
+            digest.update(chunk)
+            buffer.write(chunk)
+    if extension is None:
+        raise HTTPException(status_code=400, detail="Empty file")
+    return digest.hexdigest(), extension, size
+
+
+async def stream_image_to_disk(file: UploadFile, directory: Path) -> StreamedImage:
+    """
+    Пишем загрузку во временный файл одним вызовом в потоке, вне event loop.
+    К этому моменту Starlette уже разобрал multipart и сохранил тело целиком,
+    поэтому сигнатура и MEDIA_MAX_IMAGE_SIZE проверяются после приема всего
+    тела; ранний отказ по размеру запроса делает UploadLimitMiddleware
+    """
+    await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+    tmp_path = directory / f".{uuid.uuid4().hex}.part"
+    await file.seek(0)
+    try:
+        digest, extension, size = await asyncio.to_thread(copy_upload, file.file, tmp_path)
+    except BaseException:
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+        raise
+    return StreamedImage(tmp_path, digest, extension, size)
+
+
+def make_thumbnails(source: Path, sizes: list[int]) -> dict[int, Path]:
+    """Уменьшенные копии во временные файлы рядом с исходником"""
+    thumbnails = {}
+    with Image.open(source) as image:
+        for size in sizes:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size))
+            if image.format == "JPEG" and thumbnail.mode not in ("RGB", "L"):
+                thumbnail = thumbnail.convert("RGB")
+            target = source.with_name(f".{uuid.uuid4().hex}.part")
+            thumbnail.save(target, format=image.format)
+            thumbnails[size] = target
+    return thumbnails
+
+
+async def generate_thumbnails(source: Path) -> dict[int, Path]:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            image_executor, make_thumbnails, source, settings.MEDIA_THUMBNAIL_SIZES
+        )
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        await asyncio.to_thread(source.unlink, missing_ok=True)
+        raise HTTPException(status_code=400, detail="Invalid image file")
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from core.config import settings
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+def build_email_message(recipients: list[str], subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_USER
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+    return message
+
+
+def smtp_client() -> aiosmtplib.SMTP:
+    return aiosmtplib.SMTP(
+        hostname=settings.EMAIL_HOST,
+        port=settings.EMAIL_PORT,
+        username=settings.EMAIL_USER or None,
+        password=settings.EMAIL_PASSWORD or None,
+        use_tls=settings.EMAIL_USE_SSL,
+        start_tls=settings.EMAIL_USE_TLS,
+    )
+
+
+class PooledSMTPConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Пул долгоживущих SMTP соединений: TLS и авторизация выполняются один раз,
+    простаивающее соединение проверяется NOOP, после max_messages писем
+    или ошибки соединение закрывается и открывается заново
+    """
+
+    def __init__(self, max_size: int, max_messages: int, idle_check: float) -> None:
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.idle_check = idle_check
+        self._idle: list[PooledSMTPConnection] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self.in_use = 0
+        self.reconnects = 0
+        self.send_time = Histogram()
+
+    async def _discard(self, conn: PooledSMTPConnection) -> None:
+        try:
+            await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def _connect(self) -> PooledSMTPConnection:
+        smtp = smtp_client()
+        await smtp.connect()
+        return PooledSMTPConnection(smtp)
+
+    async def _acquire(self) -> PooledSMTPConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.smtp.is_connected:
+                continue
+            if time.monotonic() - conn.last_used > self.idle_check:
+                try:
+                    await conn.smtp.noop()
+                except Exception:
+                    await self._discard(conn)
+                    continue
+            return conn
+        return await self._connect()
+
+    async def _release(self, conn: PooledSMTPConnection, healthy: bool) -> None:
+        if healthy and conn.smtp.is_connected and conn.messages < self.max_messages:
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+        else:
+            await self._discard(conn)
+
+    async def send_message(self, message: EmailMessage) -> None:
+        started = time.perf_counter()
+        async with self._semaphore:
+            self.in_use += 1
+            try:
+                for attempt in range(2):
+                    conn = await self._acquire()
+                    try:
+                        await conn.smtp.send_message(message)
+                    except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                        await self._discard(conn)
+                        if attempt:
+                            raise
+                        self.reconnects += 1
+                        logger.warning("SMTP connection lost, reconnecting")
+                        continue
+                    except Exception:
+                        await self._release(conn, healthy=False)
+                        raise
+                    conn.messages += 1
+                    await self._release(conn, healthy=True)
+                    return
+            finally:
+                self.in_use -= 1
+                self.send_time.observe(time.perf_counter() - started)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "in_use": self.in_use,
+            "reconnects": self.reconnects,
+            "send_time": self.send_time.snapshot(),
+        }
+
+
+smtp_pool = SMTPConnectionPool(
+    max_size=settings.EMAIL_POOL_SIZE,
+    max_messages=settings.EMAIL_POOL_MAX_MESSAGES,
+    idle_check=settings.EMAIL_POOL_IDLE_CHECK
+)
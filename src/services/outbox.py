@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from core.config import settings
+from core.db import db_instance
+from models.outbox import EmailOutbox
+from repositories.outbox import EmailOutboxRepository
+from services.mail import build_email_message, smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker:
+    """
+    Фоновая отправка писем из таблицы email_outbox: пачками через общий
+    пул SMTP соединений, с повтором и экспоненциальной задержкой при ошибках
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float,
+                 max_attempts: int, retry_backoff: int) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    async def _send_batch(self, emails: list[EmailOutbox]) -> None:
+        for email in emails:
+            try:
+                message = build_email_message(email.recipients, email.subject, email.body)
+                await smtp_pool.send_message(message)
+                EmailOutboxRepository.mark_sent(email)
+            except Exception as e:
+                logger.warning(f"Email {email.id} send failed: {e}")
+                EmailOutboxRepository.mark_failed(
+                    email, e, self.max_attempts, self.retry_backoff
+                )
+
+    async def drain_once(self) -> int:
+        """Отправляем одну пачку, возвращаем количество обработанных писем"""
+        async with db_instance.session() as session:
+            repo = EmailOutboxRepository(session)
+            emails = await repo.claim_batch(self.batch_size)
+            if emails:
+                await self._send_batch(emails)
+            return len(emails)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Email outbox drain failed")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_backoff=settings.EMAIL_OUTBOX_RETRY_BACKOFF
+)
@@ -0,0 +1,84 @@
+import logging
+
+from sqlalchemy import inspect, select
+
+from core.db import db_instance
+from models.base_models import BaseModel
+from models.tasks import TaskStatus, Priority
+from models.users import Role
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceCache:
+    """
+    Маленькие, почти неизменные справочники (роли, статусы задач, приоритеты)
+    в памяти процесса в виде словарей колонок. Версия модели увеличивается
+    при каждой перезагрузке после записи
+    """
+
+    def __init__(self, models: tuple[type[BaseModel], ...]) -> None:
+        self.models = models
+        self.versions = {model: 0 for model in models}
+        self._rows: dict[type[BaseModel], dict[int, dict]] = {}
+        self._slugs: dict[type[BaseModel], dict[str, dict]] = {}
+
+    async def load(self) -> None:
+        for model in self.models:
+            await self.reload(model)
+
+    async def reload(self, model: type[BaseModel]) -> None:
+        async with db_instance.session() as session:
+            result = await session.execute(select(*inspect(model).columns))
+            rows = {row["id"]: dict(row) for row in result.mappings()}
+        self._rows[model] = rows
+        self._slugs[model] = {row["slug"]: row for row in rows.values() if row.get("slug")}
+        self.versions[model] += 1
+
+    def invalidate(self, model: type[BaseModel]) -> None:
+        """Сбрасываем справочник; до перезагрузки чтение идет из базы"""
+        self._rows.pop(model, None)
+        self._slugs.pop(model, None)
+        self.versions[model] += 1
+
+    def rows(self, model: type[BaseModel]) -> dict[int, dict] | None:
+        return self._rows.get(model)
+
+    async def fetch_many(self, session, model: type[BaseModel], column: str, values: list) -> list[dict]:
+        """
+        Строки справочника по id или slug в порядке values: из памяти, а если
+        справочник не загружен или записи в нем нет - одним запросом в базу.
+        Всегда новые словари колонок, поэтому изменение результата не портит кэш
+        """
+        index = {"id": self._rows, "slug": self._slugs}[column].get(model)
+        if index is not None and all(value in index for value in values):
+            return [dict(index[value]) for value in values]
+        result = await session.execute(
+            select(*inspect(model).columns).where(getattr(model, column).in_(values))
+        )
+        found = {row[column]: dict(row) for row in result.mappings()}
+        return [found[value] for value in values if value in found]
+
+    async def fetch(self, session, model: type[BaseModel], column: str, value) -> dict | None:
+        rows = await self.fetch_many(session, model, column, [value])
+        return rows[0] if rows else None
+
+    def table_version(self, model: type[BaseModel]) -> tuple | None:
+        """(max(updated_at), count) без запроса в базу"""
+        rows = self._rows.get(model)
+        if rows is None:
+            return None
+        return max((row["updated_at"] for row in rows.values()), default=None), len(rows)
+
+    def stats(self) -> dict:
+        return {
+            model.__tablename__: {
+                "loaded": model in self._rows,
+                "size": len(self._rows.get(model, {})),
+                "version": self.versions[model],
+            }
+            for model in self.models
+        }
+
+
+reference_cache = ReferenceCache((Role, TaskStatus, Priority))
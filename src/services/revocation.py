@@ -0,0 +1,53 @@
+import asyncio
+import logging
+
+from core.config import settings
+from core.db import db_instance
+from repositories.tokens import RevokedTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    """
+    Отозванные jti в памяти воркера: проверка - один lookup в множестве.
+    Источник правды - таблица revoked_tokens; новые отзывы приходят через
+    шину инвалидации, периодическая перезагрузка выбрасывает истекшие записи
+    """
+
+    def __init__(self) -> None:
+        self._jtis: set[str] = set()
+
+    def add(self, jti: str) -> None:
+        self._jtis.add(jti)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return bool(jti) and jti in self._jtis
+
+    async def load(self) -> None:
+        async with db_instance.session() as session:
+            jtis = await RevokedTokenRepository(session).get_active_jtis()
+        self._jtis = set(jtis)
+
+    async def on_invalidate(self, pk) -> None:
+        if pk is None:
+            await self.load()
+        else:
+            self.add(pk)
+
+    async def run_pruning(self) -> None:
+        """Фоновая задача: удаляет истекшие отзывы из базы и из памяти"""
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_PRUNE_INTERVAL)
+            try:
+                async with db_instance.session() as session:
+                    await RevokedTokenRepository(session).delete_expired()
+                await self.load()
+            except Exception:
+                logger.exception("Token revocation list pruning failed")
+
+    def stats(self) -> dict:
+        return {"revoked": len(self._jtis)}
+
+
+revocation_list = TokenRevocationList()
@@ -0,0 +1,140 @@
+import asyncio
+import errno
+import os
+import shutil
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from core.config import settings
+
+
+class MediaStorage(ABC):
+    """Хранилище медиафайлов; ключ - путь внутри /media, например avatars/ab/abcd.png"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def save(self, source: Path, key: str, content_type: str | None = None) -> None:
+        """Переносим локальный временный файл в хранилище"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def url(self, key: str) -> str:
+        ...
+
+
+def move_file(source: Path, target: Path) -> None:
+    """
+    Атомарный перенос; если временный каталог на другой файловой системе
+    (tmpfs, docker volume), копируем рядом с целью и переименовываем
+    """
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        partial = target.with_name(f".{target.name}.part")
+        try:
+            shutil.copyfile(source, partial)
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+        source.unlink(missing_ok=True)
+
+
+class LocalMediaStorage(MediaStorage):
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread((self.root / key).exists)
+
+    async def save(self, source: Path, key: str, content_type: str | None = None) -> None:
+        target = self.root / key
+        await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(move_file, source, target)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread((self.root / key).unlink, missing_ok=True)
+
+    async def url(self, key: str) -> str:
+        if settings.MEDIA_PUBLIC_BASE_URL:
+            return f"{settings.MEDIA_PUBLIC_BASE_URL.rstrip('/')}/{key}"
+        return f"/media/{key}"
+
+
+class S3MediaStorage(MediaStorage):
+    """S3-совместимое хранилище (AWS S3, MinIO); отдача файлов через presigned URL"""
+
+    def __init__(self, bucket: str, endpoint_url: str | None, access_key: str | None,
+                 secret_key: str | None, region: str, url_expires: int) -> None:
+        try:
+            import boto3
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("MEDIA_STORAGE=s3 requires boto3: install todo[s3]")
+        self.bucket = bucket
+        self.url_expires = url_expires
+        self._client_error = ClientError
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=Config(signature_version="s3v4"),
+        )
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self._client.head_object, Bucket=self.bucket, Key=key)
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def save(self, source: Path, key: str, content_type: str | None = None) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        try:
+            await asyncio.to_thread(
+                self._client.upload_file, str(source), self.bucket, key, ExtraArgs=extra_args
+            )
+        finally:
+            await asyncio.to_thread(source.unlink, missing_ok=True)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def url(self, key: str) -> str:
+        if settings.MEDIA_PUBLIC_BASE_URL:
+            return f"{settings.MEDIA_PUBLIC_BASE_URL.rstrip('/')}/{key}"
+        return await asyncio.to_thread(
+            self._client.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.url_expires,
+        )
+
+
+def build_media_storage() -> MediaStorage:
+    if settings.MEDIA_STORAGE == "s3":
+        return S3MediaStorage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            url_expires=settings.S3_PRESIGNED_URL_EXPIRE,
+        )
+    return LocalMediaStorage(settings.media_path)
+
+
+media_storage = build_media_storage()
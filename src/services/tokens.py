@@ -0,0 +1,123 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+
+from jose import JWTError, jwt
+
+from core.cache import TTLCache
+from core.config import settings
+
+HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class TokenCodec:
+    """
+    Подпись и проверка JWT. HS* считаются напрямую через hmac с заранее
+    подготовленным ключом; остальные алгоритмы уходят в python-jose.
+    Ошибки - JWTError, как у jose
+    """
+
+    def __init__(self, secret_key: str, algorithm: str) -> None:
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self._digest = HMAC_ALGORITHMS.get(algorithm)
+        self._key = secret_key.encode()
+        header = json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":"))
+        self._header = b64encode(header.encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, self._digest).digest()
+
+    def encode(self, payload: dict) -> str:
+        if self._digest is None:
+            return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        body = b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        signing_input = self._header + b"." + body
+        return (signing_input + b"." + b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict:
+        if self._digest is None:
+            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            header, body = signing_input.split(b".")
+            header_data = json.loads(b64decode(header))
+            signature = b64decode(signature)
+            payload = json.loads(b64decode(body))
+        except (ValueError, binascii.Error, UnicodeError):
+            raise JWTError("Invalid token")
+        if not isinstance(header_data, dict) or header_data.get("alg") != self.algorithm:
+            raise JWTError("The specified alg value is not allowed")
+        if not hmac.compare_digest(self._sign(signing_input), signature):
+            raise JWTError("Signature verification failed.")
+        if not isinstance(payload, dict):
+            raise JWTError("Invalid payload")
+        now = time.time()
+        if "exp" in payload:
+            if not isinstance(payload["exp"], (int, float)):
+                raise JWTError("Expiration Time claim (exp) must be an integer.")
+            if payload["exp"] <= now:
+                raise JWTError("Signature has expired.")
+        if "nbf" in payload:
+            if not isinstance(payload["nbf"], (int, float)):
+                raise JWTError("Not Before claim (nbf) must be an integer.")
+            if payload["nbf"] > now:
+                raise JWTError("The token is not yet valid (nbf)")
+        return payload
+
+
+class TokenVerifier:
+    """
+    Кэш проверенных токенов по их хэшу: повторный запрос с тем же токеном
+    не декодирует и не проверяет подпись заново. Запись живет не дольше exp
+    """
+
+    def __init__(self, codec: TokenCodec, maxsize: int, ttl: float) -> None:
+        self.codec = codec
+        self.ttl = ttl
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def verify(self, token: str) -> dict:
+        key = self._key(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            payload, exp = cached
+            if exp is None or exp > time.time():
+                return dict(payload)
+            self.cache.invalidate(key)
+        payload = self.codec.decode(token)
+        exp = payload.get("exp")
+        ttl = self.ttl if exp is None else min(self.ttl, exp - time.time())
+        if ttl > 0:
+            self.cache.set(key, (payload, exp), ttl=ttl)
+        return dict(payload)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+token_codec = TokenCodec(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+token_verifier = TokenVerifier(
+    token_codec,
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL
+)
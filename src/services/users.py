@@ -1,9 +1,8 @@
 
-from passlib.context import CryptContext
+import asyncio
 
 from services.base_service import BaseService
-
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+from services.passwords import password_hasher
 
 
 class UserService(BaseService):
@@ -11,14 +10,32 @@ class UserService(BaseService):
         self.user_repository = user_repository
 
     @staticmethod
-    def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        return await password_hasher.hash(password)
 
     @staticmethod
-    def verify_password(password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(password, hashed_password)
+    async def verify_password(password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(password, hashed_password)
 
     async def create_user(self, user_data):
         user_data = user_data.copy()
-        user_data['password'] = self.hash_password(user_data['password'])
+        user_data['password'] = await self.hash_password(user_data['password'])
         return await self.user_repository.create_data(user_data)
+
+    async def _hash_passwords(self, users_data: list[dict], keep_empty: bool = True) -> list[dict]:
+        """Хэши считаются параллельно в пуле password_hasher"""
+        rows = [user_data.copy() for user_data in users_data]
+        for row in rows:
+            if "password" in row and not row["password"] and not keep_empty:
+                del row["password"]
+        with_password = [row for row in rows if "password" in row]
+        hashes = await asyncio.gather(*(self.hash_password(row["password"]) for row in with_password))
+        for row, hashed in zip(with_password, hashes):
+            row["password"] = hashed
+        return rows
+
+    async def bulk_create_users(self, users_data: list[dict]):
+        return await self.user_repository.bulk_create(await self._hash_passwords(users_data))
+
+    async def bulk_update_users(self, users_data: list[dict]):
+        return await self.user_repository.bulk_update(await self._hash_passwords(users_data, keep_empty=False))
@@ -0,0 +1,88 @@
+import os
+from datetime import datetime
+
+import pytest
+
+
+# Settings требует переменные окружения; для тестов хватает заглушек
+for key, value in {
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_NAME": "test",
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "1025",
+    "EMAIL_USER": "test",
+    "EMAIL_PASSWORD": "test",
+    "EMAIL_USE_TLS": "false",
+    "EMAIL_USE_SSL": "false",
+    "JWT_SECRET_KEY": "test-secret",
+    "GOOGLE_CLIENT_ID": "test",
+    "GOOGLE_CLIENT_SECRET": "test",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+def _register_pg_functions(dbapi_connection, _):
+    # server_default/onupdate моделей используют TIMEZONE('...', now())
+    dbapi_connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+    dbapi_connection.create_function("TIMEZONE", 2, lambda _, value: value)
+
+
+@pytest.fixture
+def users_client(monkeypatch):
+    """Users router on in-memory SQLite with two users and one role"""
+    # Imported here: settings are read at import time and need the env above
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    from api.endpoints.users import router as users_router
+    from core.db import invalidation_bus
+    from models import BaseModel, Role, User, association_table
+
+    async def publish(*_):
+        # pg_notify есть только в Postgres
+        return None
+
+    monkeypatch.setattr(invalidation_bus, "publish", publish)
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine.sync_engine, "connect", _register_pg_functions)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    app = FastAPI()
+    app.include_router(users_router)
+
+    @app.middleware("http")
+    async def db_session(request: Request, call_next):
+        async with sessions() as session:
+            request.state.db = session
+            return await call_next(request)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                BaseModel.metadata.create_all,
+                tables=[User.__table__, Role.__table__, association_table],
+            )
+        async with sessions() as session:
+            session.add_all([
+                Role(id=1, name="admin"),
+                User(id=1, email="first@example.com", first_name="First"),
+                User(id=2, email="second@example.com", first_name="Second"),
+            ])
+            await session.commit()
+
+    with TestClient(app) as test_client:
+        test_client.portal.call(setup)
+        test_client.sessions = sessions
+        yield test_client
+        test_client.portal.call(engine.dispose)
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from middleware.admission_middleware import AdmissionMiddleware
+from services.admission import AdmissionController, Overloaded, RouteGroup, admission_controller
+
+
+def _group(concurrency=1, max_queue=1, pressure=()):
+    return RouteGroup("test", concurrency=concurrency, max_queue=max_queue,
+                      match=lambda method, path: True, pressure=pressure)
+
+
+@pytest.mark.parametrize("method, path, group", [
+    ("POST", "/api/auth/login", "password"),
+    ("PATCH", "/api/users/batch", "password"),
+    ("PATCH", "/api/users/1", "write"),
+    ("POST", "/api/projects/", "write"),
+    ("GET", "/api/users/", "read"),
+    ("HEAD", "/api/auth/me", "read"),
+])
+def test_route_groups(method, path, group):
+    assert admission_controller.group_for(method, path).name == group
+
+
+@pytest.mark.parametrize("path", ["/api/metrics/", "/docs", "/media/avatar.png"])
+def test_unguarded_paths(path):
+    assert admission_controller.group_for("GET", path) is None
+
+
+def test_queued_request_is_admitted_when_a_slot_frees():
+    group = _group()
+
+    async def scenario():
+        await group.acquire(timeout=1)
+        waiter = asyncio.create_task(group.acquire(timeout=1))
+        await asyncio.sleep(0)
+        assert group.queued == 1
+        group.release()
+        await waiter
+
+    asyncio.run(scenario())
+    assert group.stats() == {"concurrency": 1, "running": 1, "queued": 0, "admitted": 2, "shed": 0}
+
+
+def test_queue_timeout_sheds():
+    group = _group()
+
+    async def scenario():
+        await group.acquire(timeout=1)
+        with pytest.raises(Overloaded):
+            await group.acquire(timeout=0.01)
+
+    asyncio.run(scenario())
+    assert (group.running, group.queued, group.shed) == (1, 0, 1)
+
+
+def test_full_queue_sheds_without_waiting():
+    group = _group(max_queue=0)
+
+    async def scenario():
+        await group.acquire(timeout=1)
+        with pytest.raises(Overloaded):
+            await group.acquire(timeout=10)
+
+    asyncio.run(asyncio.wait_for(scenario(), 1))
+    assert group.shed == 1
+
+
+def test_pressure_sheds_before_taking_a_slot():
+    group = _group(pressure=(lambda: False, lambda: True))
+
+    with pytest.raises(Overloaded):
+        asyncio.run(group.acquire(timeout=1))
+    assert (group.running, group.admitted, group.shed) == (0, 0, 1)
+
+
+def _client(group):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        assert group.running == 1
+        return "pong"
+
+    @app.get("/api/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(AdmissionMiddleware, controller=AdmissionController((group,)))
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_admitted_request_releases_its_slot():
+    group = _group()
+    client = _client(group)
+
+    assert client.get("/api/ping").json() == "pong"
+    assert client.get("/api/boom").status_code == 500
+    assert (group.running, group.admitted) == (0, 2)
+
+
+def test_overloaded_request_gets_503_with_retry_after():
+    group = _group(pressure=(lambda: True,))
+
+    response = _client(group).get("/api/ping")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.ADMISSION_RETRY_AFTER)
+    assert response.json() == {"detail": "Service is overloaded, retry later"}
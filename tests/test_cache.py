@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("core.cache.time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a", "missing") == "missing"
+    assert cache.stats()["size"] == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2)
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_set_refreshes_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    clock.now += 50
+    cache.set("a", 2)
+
+    clock.now += 50
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_overwrite_does_not_evict():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.set("a", 10)
+
+    assert (cache.get("a"), cache.get("b")) == (10, 2)
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("empty", [])
+
+    assert cache.get("empty", "missing") == []
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("unknown")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_stats_count_hits_and_misses(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    clock.now += 60
+    cache.get("a")
+
+    assert cache.stats() == {"size": 0, "maxsize": 10, "hits": 1, "misses": 2}
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from core.http_cache import cache_headers, make_etag, not_modified_response
+
+# 18:00 в Бишкеке (UTC+6), так updated_at хранится в базе
+UPDATED_AT = datetime(2024, 5, 1, 18, 0, 0, 500000)
+LAST_MODIFIED = "Wed, 01 May 2024 12:00:00 GMT"
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_etag_is_weak_and_stable():
+    etag = make_etag("user", 1, UPDATED_AT)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("user", 1, UPDATED_AT)
+    assert etag != make_etag("user", 2, UPDATED_AT)
+    assert etag != make_etag("user", 1, UPDATED_AT.replace(second=1))
+
+
+def test_cache_headers_convert_db_time_to_http_date():
+    headers = cache_headers('W/"x"', UPDATED_AT)
+
+    assert headers["ETag"] == 'W/"x"'
+    assert headers["Last-Modified"] == LAST_MODIFIED
+    assert "Cache-Control" in headers
+
+
+def test_cache_headers_without_last_modified():
+    assert "Last-Modified" not in cache_headers('W/"x"')
+
+
+@pytest.mark.parametrize("if_none_match", [
+    'W/"abc"',
+    '"abc"',
+    '"other", W/"abc"',
+    "*",
+])
+def test_matching_if_none_match_returns_304(if_none_match):
+    response = not_modified_response(_request(if_none_match=if_none_match), 'W/"abc"', UPDATED_AT)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.headers["last-modified"] == LAST_MODIFIED
+
+
+def test_stale_if_none_match_returns_none():
+    assert not_modified_response(_request(if_none_match='W/"old"'), 'W/"abc"', UPDATED_AT) is None
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = _request(if_none_match='W/"old"', if_modified_since=LAST_MODIFIED)
+
+    assert not_modified_response(request, 'W/"abc"', UPDATED_AT) is None
+
+
+@pytest.mark.parametrize("since, not_modified", [
+    (LAST_MODIFIED, True),
+    ("Wed, 01 May 2024 12:00:01 GMT", True),
+    ("Wed, 01 May 2024 11:59:59 GMT", False),
+    ("yesterday", False),
+])
+def test_if_modified_since(since, not_modified):
+    response = not_modified_response(_request(if_modified_since=since), 'W/"abc"', UPDATED_AT)
+
+    assert (response is not None) is not_modified
+
+
+def test_if_modified_since_without_last_modified_is_ignored():
+    assert not_modified_response(_request(if_modified_since=LAST_MODIFIED), 'W/"abc"') is None
+
+
+def test_no_conditional_headers():
+    assert not_modified_response(_request(), 'W/"abc"', UPDATED_AT) is None
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.db import InvalidationBus
+
+bus = InvalidationBus("postgresql://unused", "invalidation")
+bus.register("users", lambda pk: None)
+
+
+@pytest.fixture
+def notifications():
+    return []
+
+
+@pytest.fixture
+def run(notifications):
+    def run(work):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+
+            def register(dbapi_connection, _):
+                def pg_notify(channel, payload):
+                    notifications.append((channel, json.loads(payload)))
+
+                dbapi_connection.create_function("pg_notify", 2, pg_notify)
+
+            event.listen(engine.sync_engine, "connect", register)
+            try:
+                async with async_sessionmaker(engine)() as session:
+                    await session.execute(text("SELECT 1"))
+                    await work(session)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(main())
+
+    return run
+
+
+def events(notifications):
+    return [(payload["table"], payload["pk"]) for _, payload in notifications]
+
+
+def test_events_are_sent_at_commit(run, notifications):
+    async def work(session):
+        await bus.publish(session, "users", 1)
+        await bus.publish(session, "users", 2)
+        assert notifications == []
+        await session.commit()
+
+    run(work)
+
+    assert sorted(events(notifications)) == [("users", 1), ("users", 2)]
+    assert {channel for channel, _ in notifications} == {"invalidation"}
+    assert {payload["origin"] for _, payload in notifications} == {bus.origin}
+
+
+def test_tables_without_handlers_are_not_published(run, notifications):
+    async def work(session):
+        await bus.publish(session, "projects", 1)
+        await session.commit()
+
+    run(work)
+
+    assert notifications == []
+
+
+def test_table_wide_event_replaces_row_events(run, notifications):
+    async def work(session):
+        await bus.publish(session, "users", 1)
+        await bus.publish(session, "users", None)
+        await bus.publish(session, "users", 1)
+        await session.commit()
+
+    run(work)
+
+    assert events(notifications) == [("users", None)]
+
+
+def test_rollback_drops_pending_events(run, notifications):
+    async def work(session):
+        await bus.publish(session, "users", 1)
+        await session.rollback()
+        await session.execute(text("SELECT 1"))
+        await session.commit()
+
+    run(work)
+
+    assert notifications == []
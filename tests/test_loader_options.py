@@ -0,0 +1,61 @@
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from repositories.base_repository import nested_schema
+from repositories.projects import ProjectRepository
+from repositories.users import UserRepository
+from schemas.projects import ProjectResponseSchema, ProjectsResponseSchema
+from schemas.roles import RoleSchema
+from schemas.users import UserResponseSchema
+
+
+def _paths(options) -> set[str]:
+    """Пути связей, которые загрузят опции: "tasks.performer.roles" и т.п."""
+    return {
+        ".".join(prop.key for prop in context.path.natural_path[1::2])
+        for option in options
+        for context in option.context
+    }
+
+
+@pytest.mark.parametrize("annotation", [RoleSchema, List[RoleSchema], Optional[RoleSchema],
+                                        Optional[List[RoleSchema]]])
+def test_nested_schema_unwraps_annotations(annotation):
+    assert nested_schema(annotation) is RoleSchema
+
+
+@pytest.mark.parametrize("annotation", [int, Optional[str], List[int]])
+def test_nested_schema_ignores_plain_types(annotation):
+    assert nested_schema(annotation) is None
+
+
+def test_list_schema_loads_no_relationships():
+    assert ProjectRepository.plan_loader_options(ProjectsResponseSchema) == []
+
+
+def test_detail_schema_loads_only_its_relationships():
+    assert _paths(ProjectRepository.plan_loader_options(ProjectResponseSchema)) == {
+        "owner", "owner.roles",
+        "participating_users", "participating_users.roles",
+        "tasks", "tasks.performer", "tasks.performer.roles", "tasks.status", "tasks.priority",
+    }
+
+
+def test_projection_reads_columns_and_first_level_relations():
+    columns, relations = UserRepository.schema_projection(UserResponseSchema, extra=("id", "created_at"))
+
+    assert [column.key for column in columns] == [
+        "id", "created_at", "email", "image", "thumbnails", "first_name", "last_name",
+    ]
+    assert [column.key for column in relations["roles"]] == list(RoleSchema.model_fields)
+
+
+def test_projection_falls_back_for_nested_relations_and_computed_fields():
+    class WithComputed(BaseModel):
+        id: int
+        full_name: str
+
+    assert ProjectRepository.schema_projection(ProjectResponseSchema) is None
+    assert UserRepository.schema_projection(WithComputed) is None
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.endpoints.metrics import router
+
+
+def make_client(user):
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.middleware("http")
+    async def principal(request: Request, call_next):
+        request.state.user = user
+        return await call_next(request)
+
+    return TestClient(app)
+
+
+def test_anonymous_request_is_rejected_with_401():
+    response = make_client(None).get("/metrics/")
+
+    assert response.status_code == 401
+
+
+def test_user_without_metrics_role_is_rejected_with_403():
+    user = SimpleNamespace(id=1, roles=[SimpleNamespace(slug="editor")])
+
+    response = make_client(user).get("/metrics/")
+
+    assert response.status_code == 403
+
+
+def test_admin_can_read_metrics():
+    user = SimpleNamespace(id=1, roles=[SimpleNamespace(slug="editor"), SimpleNamespace(slug="admin")])
+
+    response = make_client(user).get("/metrics/")
+
+    assert response.status_code == 200
+    assert {"db_pool", "admission", "principal_cache"} <= response.json().keys()
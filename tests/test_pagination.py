@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from repositories.base_repository import decode_cursor, encode_cursor
+from repositories.users import UserRepository
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("value", [7, "title", None])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor(value, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, 42)
+
+
+def test_datetime_cursor_is_encoded_as_isoformat():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 3)) == (created_at.isoformat(), 3)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _raw_cursor({"value": 1, "id": 2}),
+    _raw_cursor([1, 2, 3]),
+    _raw_cursor([1, "2"]),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_unknown_sort_field_is_rejected():
+    with pytest.raises(ValueError, match="Sorting by 'password' is not allowed"):
+        UserRepository(None)._page_statement(None, 10, None, "-password", None)
+
+
+def test_unknown_filter_field_is_rejected():
+    with pytest.raises(ValueError, match="Filtering by 'password' is not allowed"):
+        UserRepository(None)._page_statement(None, 10, None, "id", {"password": "x"})
+
+
+def _walk(client, sort):
+    ids, params = [], {"limit": 1, "sort": sort}
+    while True:
+        response = client.get("/users/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        ids += [item["id"] for item in page["items"]]
+        if page["next_cursor"] is None:
+            return ids
+        params["after"] = page["next_cursor"]
+
+
+@pytest.mark.parametrize("sort, expected", [
+    ("id", [1, 2]),
+    ("-id", [2, 1]),
+    ("-created_at", [2, 1]),
+])
+def test_pages_follow_cursor_without_gaps(users_client, sort, expected):
+    assert _walk(users_client, sort) == expected
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"sort": "password"}, "Sorting by 'password' is not allowed"),
+    ({"after": "garbage"}, "Invalid cursor"),
+])
+def test_bad_page_request_is_rejected_with_400(users_client, params, detail):
+    response = users_client.get("/users/", params=params)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
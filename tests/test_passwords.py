@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.passwords import PasswordHasher, pwd_context
+
+
+@pytest.fixture(params=["thread", "process"])
+def hasher(request):
+    hasher = PasswordHasher(request.param, workers=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher):
+    async def scenario():
+        hashed = await hasher.hash("secret")
+        return hashed, await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, good, bad = asyncio.run(scenario())
+
+    assert pwd_context.identify(hashed) == "pbkdf2_sha256"
+    assert (good, bad) == (True, False)
+    assert hasher.stats()["run_time"]["count"] == 3
+
+
+def test_concurrency_is_bounded_by_workers():
+    hasher = PasswordHasher("thread", workers=2)
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    async def scenario():
+        tasks = [asyncio.create_task(hasher._run(work)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        queued = hasher.queued
+        await asyncio.gather(*tasks)
+        return queued
+
+    try:
+        queued = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    assert peak[0] == 2
+    assert queued == 4
+    assert (hasher.queued, hasher.running) == (0, 0)
+
+
+def test_executor_is_created_lazily_and_recreated_after_shutdown():
+    hasher = PasswordHasher("thread", workers=1)
+    assert hasher._executor is None
+
+    executor = hasher.executor
+    hasher.shutdown()
+
+    assert hasher._executor is None
+    assert hasher.executor is not executor
+    hasher.shutdown()
@@ -0,0 +1,97 @@
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.endpoints.auth import router
+from core.config import settings
+from repositories.users import UserRepository
+from services import base_service
+from services.storage import LocalMediaStorage
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "MEDIA_UPLOAD_TMP_DIR", tmp_path)
+
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.middleware("http")
+    async def principal(request: Request, call_next):
+        request.state.db = None
+        request.state.user = SimpleNamespace(id=1)
+        return await call_next(request)
+
+    with TestClient(app) as test_client:
+        test_client.tmp_path = tmp_path
+        yield test_client
+
+
+def test_oversized_image_is_rejected_with_413(client, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_IMAGE_SIZE", 1024)
+    image = PNG_HEADER + b"\0" * 4096
+
+    response = client.patch("/auth/me", files={"image": ("avatar.png", image, "image/png")})
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Image is too large"}
+    assert list(client.tmp_path.iterdir()) == []
+
+
+def test_non_image_upload_is_rejected_with_400(client):
+    response = client.patch("/auth/me", files={"image": ("avatar.png", b"GIF? no, text", "image/png")})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Only image files allowed"}
+    assert list(client.tmp_path.iterdir()) == []
+
+
+def test_non_image_content_type_is_rejected_with_400(client):
+    response = client.patch("/auth/me", files={"image": ("notes.txt", b"hello", "text/plain")})
+
+    assert response.status_code == 400
+
+
+def test_missing_user_is_reported_as_404(client, monkeypatch):
+    async def patch_user(self, user_id, data):
+        return None
+
+    monkeypatch.setattr(UserRepository, "patch_user", patch_user)
+
+    response = client.patch("/auth/me", data={"first_name": "Ghost"})
+
+    assert response.status_code == 404
+
+
+def test_uploaded_avatar_thumbnails_are_stored_and_returned(client, monkeypatch):
+    storage = LocalMediaStorage(client.tmp_path / "media")
+    monkeypatch.setattr(base_service, "media_storage", storage)
+    saved = {}
+
+    async def patch_user(self, user_id, data):
+        saved.update(data)
+        now = datetime.now()
+        return {"id": user_id, "email": "user@example.com", "first_name": "", "last_name": "",
+                "roles": [], "created_at": now, "updated_at": now, **data}
+
+    monkeypatch.setattr(UserRepository, "patch_user", patch_user)
+    image = io.BytesIO()
+    Image.new("RGB", (512, 512), "red").save(image, format="PNG")
+
+    response = client.patch("/auth/me", files={"image": ("avatar.png", image.getvalue(), "image/png")})
+
+    assert response.status_code == 200
+    assert set(saved["thumbnails"]) == {"64", "256"}
+    for size, path in saved["thumbnails"].items():
+        with Image.open(storage.root / path.removeprefix("/media/")) as thumbnail:
+            assert max(thumbnail.size) == int(size)
+    assert response.json()["thumbnails"] == {
+        size: f"http://testserver{path}" for size, path in saved["thumbnails"].items()
+    }
@@ -0,0 +1,98 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, event
+
+from models import Role
+from services.reference_data import ReferenceCache
+
+
+@pytest.fixture
+def cache(users_client, monkeypatch):
+    @asynccontextmanager
+    async def session():
+        async with users_client.sessions() as db:
+            yield db
+
+    monkeypatch.setattr("services.reference_data.db_instance", SimpleNamespace(session=session))
+    cache = ReferenceCache((Role,))
+    cache.client = users_client
+    return cache
+
+
+def _call(cache, method, *args):
+    """Вызов метода кэша в сессии тестовой базы; возвращает результат и число запросов"""
+    async def run():
+        async with cache.client.sessions() as db:
+            statements = []
+            listener = lambda *_: statements.append(1)
+            event.listen(db.bind.sync_engine, "before_cursor_execute", listener)
+            try:
+                return await getattr(cache, method)(db, *args), len(statements)
+            finally:
+                event.remove(db.bind.sync_engine, "before_cursor_execute", listener)
+
+    return cache.client.portal.call(run)
+
+
+def _delete_roles(cache):
+    async def run():
+        async with cache.client.sessions() as db:
+            await db.execute(delete(Role))
+            await db.commit()
+
+    cache.client.portal.call(run)
+
+
+def test_unloaded_cache_reads_from_database(cache):
+    row, queries = _call(cache, "fetch", Role, "id", 1)
+
+    assert row["slug"] == "admin"
+    assert queries == 1
+    assert cache.table_version(Role) is None
+
+
+def test_loaded_cache_serves_by_id_and_slug_without_queries(cache):
+    cache.client.portal.call(cache.reload, Role)
+    _delete_roles(cache)
+
+    by_id, id_queries = _call(cache, "fetch", Role, "id", 1)
+    by_slug, slug_queries = _call(cache, "fetch", Role, "slug", "admin")
+
+    assert by_id == by_slug
+    assert by_id["name"] == "admin"
+    assert (id_queries, slug_queries) == (0, 0)
+
+
+def test_missing_key_falls_back_to_database(cache):
+    cache.client.portal.call(cache.reload, Role)
+
+    rows, queries = _call(cache, "fetch_many", Role, "id", [1, 99])
+
+    assert [row["id"] for row in rows] == [1]
+    assert queries == 1
+
+
+def test_returned_rows_are_copies(cache):
+    cache.client.portal.call(cache.reload, Role)
+
+    row, _ = _call(cache, "fetch", Role, "id", 1)
+    row["name"] = "changed"
+
+    assert _call(cache, "fetch", Role, "id", 1)[0]["name"] == "admin"
+    assert cache.rows(Role)[1]["name"] == "admin"
+
+
+def test_reload_and_invalidate_bump_version(cache):
+    cache.client.portal.call(cache.reload, Role)
+    updated_at = cache.rows(Role)[1]["updated_at"]
+
+    assert cache.table_version(Role) == (updated_at, 1)
+    assert cache.stats() == {"roles": {"loaded": True, "size": 1, "version": 1}}
+
+    cache.invalidate(Role)
+
+    assert cache.rows(Role) is None
+    assert cache.table_version(Role) is None
+    assert cache.stats() == {"roles": {"loaded": False, "size": 0, "version": 2}}
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, MetaData, String, Table, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.config import settings
+from core.db import ReplicaRouter, RoutingSession
+from middleware.db_middleware import DBSessionMiddleware
+
+metadata = MetaData()
+marker = Table("marker", metadata, Column("name", String))
+
+
+@pytest.fixture
+def client(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    router = ReplicaRouter([replica])
+    sessions = async_sessionmaker(primary, expire_on_commit=False,
+                                  sync_session_class=RoutingSession, info={"router": router})
+
+    app = FastAPI()
+    app.add_middleware(DBSessionMiddleware, session_factory=sessions, replica_router=router)
+
+    async def name(request: Request, stmt):
+        return (await request.state.db.execute(stmt)).scalar_one()
+
+    @app.get("/where")
+    async def where(request: Request):
+        return await name(request, select(marker.c.name))
+
+    @app.get("/where/locked")
+    async def where_locked(request: Request):
+        return await name(request, select(marker.c.name).with_for_update())
+
+    @app.get("/where/primary")
+    async def where_primary(request: Request):
+        return await name(request, select(marker.c.name).execution_options(primary=True))
+
+    @app.post("/write")
+    async def write(request: Request):
+        await request.state.db.execute(update(marker).values(name="primary"))
+        await request.state.db.commit()
+
+    async def setup():
+        for engine, value in ((primary, "primary"), (replica, "replica")):
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all)
+                await conn.execute(marker.insert().values(name=value))
+
+    with TestClient(app) as test_client:
+        test_client.portal.call(setup)
+        yield test_client
+        test_client.portal.call(primary.dispose)
+        test_client.portal.call(replica.dispose)
+
+
+def test_reads_go_to_the_replica(client):
+    assert client.get("/where").json() == "replica"
+
+
+def test_locking_and_primary_reads_stay_on_the_primary(client):
+    assert client.get("/where/locked").json() == "primary"
+    assert client.get("/where/primary").json() == "primary"
+
+
+def test_write_marker_cookie_keeps_reads_on_the_primary(client):
+    response = client.post("/write")
+
+    assert settings.DB_READ_YOUR_WRITES_COOKIE in response.cookies
+    # Any worker receiving the cookie routes the read to the primary
+    assert client.get("/where").json() == "primary"
+
+
+def test_expired_write_marker_is_ignored(client):
+    stale = time.time() - settings.DB_READ_YOUR_WRITES_WINDOW - 1
+    client.cookies.set(settings.DB_READ_YOUR_WRITES_COOKIE, f"{stale:.3f}")
+
+    assert client.get("/where").json() == "replica"
+
+
+def test_reads_without_writes_do_not_set_the_cookie(client):
+    response = client.get("/where")
+
+    assert settings.DB_READ_YOUR_WRITES_COOKIE not in response.cookies
@@ -0,0 +1,16 @@
+from core.db import Database
+from server import post_fork
+
+
+def test_post_fork_resets_primary_and_replica_pools(tmp_path, monkeypatch):
+    db = Database(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        [f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"],
+    )
+    engines = [db._engine, *db.replica_router.engines]
+    pools = [engine.pool for engine in engines]
+    monkeypatch.setattr("core.db.db_instance", db)
+
+    post_fork(server=None, worker=None)
+
+    assert all(engine.pool is not pool for engine, pool in zip(engines, pools))
@@ -0,0 +1,127 @@
+import json
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from services.tokens import TokenCodec, TokenVerifier, b64encode
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def codec():
+    return TokenCodec(SECRET, "HS256")
+
+
+def _forge(header: dict, payload: dict, signature: bytes = b"") -> str:
+    parts = [json.dumps(header).encode(), json.dumps(payload).encode()]
+    return b".".join([*(b64encode(part) for part in parts), b64encode(signature)]).decode()
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_tokens_are_interchangeable_with_jose(algorithm):
+    codec = TokenCodec(SECRET, algorithm)
+    payload = {"sub": "1", "type": "access", "exp": int(time.time()) + 60}
+
+    assert jwt.decode(codec.encode(payload), SECRET, algorithms=[algorithm]) == payload
+    assert codec.decode(jwt.encode(payload, SECRET, algorithm=algorithm)) == payload
+
+
+def test_alg_none_is_rejected(codec):
+    with pytest.raises(JWTError):
+        codec.decode(_forge({"alg": "none", "typ": "JWT"}, {"sub": "1"}))
+
+
+def test_other_hmac_algorithm_is_rejected(codec):
+    token = jwt.encode({"sub": "1"}, SECRET, algorithm="HS512")
+
+    with pytest.raises(JWTError):
+        codec.decode(token)
+
+
+def test_header_alg_cannot_be_swapped(codec):
+    header, body, signature = codec.encode({"sub": "1"}).split(".")
+    swapped = b64encode(json.dumps({"alg": "HS512", "typ": "JWT"}).encode()).decode()
+
+    with pytest.raises(JWTError):
+        codec.decode(".".join([swapped, body, signature]))
+
+
+def test_tampered_payload_is_rejected(codec):
+    header, _, signature = codec.encode({"sub": "1"}).split(".")
+    body = b64encode(json.dumps({"sub": "2"}).encode()).decode()
+
+    with pytest.raises(JWTError):
+        codec.decode(".".join([header, body, signature]))
+
+
+def test_wrong_secret_is_rejected(codec):
+    with pytest.raises(JWTError):
+        codec.decode(jwt.encode({"sub": "1"}, "other-secret", algorithm="HS256"))
+
+
+def test_expired_token_is_rejected(codec):
+    with pytest.raises(JWTError):
+        codec.decode(codec.encode({"sub": "1", "exp": int(time.time()) - 1}))
+
+
+def test_token_before_nbf_is_rejected(codec):
+    with pytest.raises(JWTError):
+        codec.decode(codec.encode({"sub": "1", "nbf": int(time.time()) + 60}))
+
+
+def test_token_after_nbf_is_accepted(codec):
+    payload = {"sub": "1", "nbf": int(time.time()) - 1, "exp": int(time.time()) + 60}
+
+    assert codec.decode(codec.encode(payload)) == payload
+
+
+@pytest.mark.parametrize("claim", ["exp", "nbf"])
+def test_non_numeric_time_claims_are_rejected(codec, claim):
+    with pytest.raises(JWTError):
+        codec.decode(codec.encode({"sub": "1", claim: "soon"}))
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "abc",
+    "a.b",
+    "a.b.c.d",
+    "!!!.???.***",
+    "тест.тест.тест",
+    b64encode(b"{").decode() + ".e30.",
+])
+def test_malformed_tokens_raise_jwt_error(codec, token):
+    with pytest.raises(JWTError):
+        codec.decode(token)
+
+
+def test_signed_non_object_payload_is_rejected(codec):
+    header = b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    body = b64encode(b"[1, 2]")
+    signing_input = header + b"." + body
+    token = signing_input + b"." + b64encode(codec._sign(signing_input))
+
+    with pytest.raises(JWTError):
+        codec.decode(token.decode())
+
+
+def test_verifier_does_not_serve_expired_tokens_from_cache(codec, monkeypatch):
+    verifier = TokenVerifier(codec, maxsize=10, ttl=300)
+    now = time.time()
+    token = codec.encode({"sub": "1", "exp": int(now) + 5})
+    assert verifier.verify(token)["sub"] == "1"
+
+    monkeypatch.setattr(time, "time", lambda: now + 10)
+    with pytest.raises(JWTError):
+        verifier.verify(token)
+
+
+def test_verifier_returns_independent_copies(codec):
+    verifier = TokenVerifier(codec, maxsize=10, ttl=300)
+    token = codec.encode({"sub": "1"})
+
+    verifier.verify(token)["sub"] = "2"
+
+    assert verifier.verify(token)["sub"] == "1"
@@ -0,0 +1,56 @@
+from sqlalchemy import select
+
+from models import User, association_table
+from repositories.users import UserRepository
+
+
+def _state(client, user_id):
+    """updated_at (источник Last-Modified) и роли пользователя"""
+    async def fetch():
+        async with client.sessions() as session:
+            updated_at = await session.scalar(select(User.updated_at).where(User.id == user_id))
+            roles = await session.scalars(
+                select(association_table.c.roles_id).where(association_table.c.users_id == user_id)
+            )
+            return updated_at, sorted(roles)
+
+    return client.portal.call(fetch)
+
+
+def _patch(client, user_id, data):
+    async def patch():
+        async with client.sessions() as session:
+            return await UserRepository(session).patch_user(user_id, data)
+
+    return client.portal.call(patch)
+
+
+def test_role_change_moves_last_modified(users_client):
+    before, _ = _state(users_client, 1)
+
+    updated = _patch(users_client, 1, {"roles": [1]})
+
+    after, roles = _state(users_client, 1)
+    assert roles == [1]
+    assert after > before
+    assert updated["updated_at"] == after
+
+
+def test_unchanged_roles_keep_last_modified(users_client):
+    _patch(users_client, 1, {"roles": [1]})
+    before, _ = _state(users_client, 1)
+
+    _patch(users_client, 1, {"roles": [1]})
+
+    assert _state(users_client, 1)[0] == before
+
+
+def test_batch_role_change_moves_last_modified(users_client):
+    before, _ = _state(users_client, 2)
+
+    response = users_client.patch("/users/batch", json={"items": [{"id": 2, "roles": [1]}]})
+
+    assert response.status_code == 207
+    after, roles = _state(users_client, 2)
+    assert roles == [1]
+    assert after > before
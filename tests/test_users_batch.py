@@ -0,0 +1,42 @@
+from sqlalchemy import select
+
+from models import User
+
+
+def _users(client):
+    async def fetch():
+        async with client.sessions() as session:
+            users = await session.scalars(select(User).order_by(User.id))
+            return [(user.id, user.email, user.first_name) for user in users]
+
+    return client.portal.call(fetch)
+
+
+def test_patch_batch_updates_every_row(users_client):
+    response = users_client.patch("/users/batch", json={"items": [
+        {"id": 1, "first_name": "Alice"},
+        {"id": 2, "email": "bob@example.com", "first_name": "Bob"},
+    ]})
+
+    assert response.status_code == 207
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 200]
+    assert [result["item"]["first_name"] for result in results] == ["Alice", "Bob"]
+    assert _users(users_client) == [
+        (1, "first@example.com", "Alice"),
+        (2, "bob@example.com", "Bob"),
+    ]
+
+
+def test_patch_batch_reports_missing_and_conflicting_items(users_client):
+    response = users_client.patch("/users/batch", json={"items": [
+        {"id": 1, "email": "second@example.com"},
+        {"id": 3, "first_name": "Nobody"},
+    ]})
+
+    assert response.status_code == 207
+    assert [result["status"] for result in response.json()["results"]] == [409, 404]
+    assert _users(users_client) == [
+        (1, "first@example.com", "First"),
+        (2, "second@example.com", "Second"),
+    ]